@@ -0,0 +1,50 @@
+"""Semantic-score stage: per-pair compute_similarity versus batch_similarity.
+
+Usage (from backend/):
+    python -m benchmarks.bench_embedding --n 500
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.matcher import batch_similarity, compute_similarity  # noqa: E402
+
+WORDS = (
+    "python java react docker kubernetes engineer developed deployed scalable backend services "
+    "team led project university bachelor computer science machine learning data pipeline api "
+    "experience years intern designed implemented tested optimized cloud aws sql analytics"
+).split()
+
+
+def _text(rng, n_words):
+    return " ".join(rng.choice(WORDS) for _ in range(n_words))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=500, help="Number of resumes")
+    parser.add_argument("--words", type=int, default=600, help="Words per resume")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    jd = _text(rng, 300)
+    resumes = [_text(rng, args.words) for _ in range(args.n)]
+
+    start = time.perf_counter()
+    pairwise = [compute_similarity(jd, r) for r in resumes]
+    t_pair = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = batch_similarity(jd, resumes)
+    t_batch = time.perf_counter() - start
+
+    max_diff = max(abs(a - float(b)) for a, b in zip(pairwise, batched))
+    print(f"pairwise: {t_pair:.2f}s  batched: {t_batch:.2f}s  speedup: x{t_pair / t_batch:.1f}  max |diff|: {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
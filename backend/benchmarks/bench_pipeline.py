@@ -0,0 +1,234 @@
+"""End-to-end analyze_all_resumes benchmark on a synthetic corpus, with the LLM replaced by a local stub.
+
+For each corpus size a fresh interpreter loads the model and runs the full analysis --repeat
+times. It reports full-run p50/p95 and throughput, per-stage p50/p95 (extract, skills, parse,
+education and experience per resume; embed and llm per run; llm_request per HTTP call) and the
+peak RSS of the interpreter and of its largest child process (pool workers in process mode).
+The report is saved as JSON; pass an earlier report to --compare to print p50 ratios against it.
+
+The extracted-text cache is cleared before every run unless --warm-cache is given, and the LLM
+cache and vector-store indexing are disabled, so runs stay comparable. Each size uses its own
+throwaway text cache (TEXT_CACHE_DIR), never the server's cache/text.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pipeline --sizes 10 100 1000 --repeat 3
+    python -m benchmarks.bench_pipeline --sizes 100 --mode process --workers 4 --compare benchmarks/results/old.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = BACKEND_DIR / "benchmarks" / "results"
+
+sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks import llm_stub  # noqa: E402
+from benchmarks.corpus import SIZES, generate_corpus  # noqa: E402
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Linear-interpolated percentile, q in [0, 100]."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    total = sum(samples)
+    return {
+        "count": len(samples),
+        "p50_ms": round(_percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(_percentile(samples, 95) * 1000, 3),
+        "mean_ms": round(total / len(samples) * 1000, 3) if samples else 0.0,
+        "total_s": round(total, 4),
+        # Items per second of time spent in the stage (summed over workers in process mode).
+        "per_sec": round(len(samples) / total, 2) if total else 0.0,
+    }
+
+
+def _peak_rss_mb(who: int) -> float:
+    rss = resource.getrusage(who).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 1024  # bytes on macOS, KiB on Linux
+
+
+def _capture(histogram, samples: Dict[str, List[float]], label: str = "") -> None:
+    """Keeps every observation of a metrics histogram, keyed by the given label (or a fixed name)."""
+    observe = histogram.observe
+
+    def recording_observe(value: float, **labels: str) -> None:
+        samples.setdefault(labels.get(label, label), []).append(value)
+        observe(value, **labels)
+
+    histogram.observe = recording_observe
+
+
+def run_child(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs inside the per-size interpreter; the parent has already set the environment."""
+    from resume.analysis import analyze_all_resumes
+    from utils import metrics, text_cache
+    from utils.matcher import warm_up
+
+    start = time.perf_counter()
+    warm_up()
+    model_load = time.perf_counter() - start
+
+    samples: Dict[str, List[float]] = {}
+    _capture(metrics.STAGE_SECONDS, samples, "stage")
+    _capture(metrics.LLM_LATENCY, samples, "llm_request")
+
+    walls, candidates, reviewed = [], 0, 0
+    for _ in range(config["repeat"]):
+        if not config["warm_cache"]:
+            text_cache.clear()
+        start = time.perf_counter()
+        results = analyze_all_resumes(config["jd"], {}, config["resumes"], mode=config["mode"],
+                                      workers=config["workers"], llm_top_k=config["llm_top_k"])
+        walls.append(time.perf_counter() - start)
+        candidates = len(results)
+        reviewed = sum(1 for r in results if r.get("reviewed"))
+
+    n = len(config["resumes"])
+    p50 = _percentile(walls, 50)
+    return {
+        "resumes": n,
+        "candidates": candidates,
+        "llm_reviewed": reviewed,
+        "model_load_s": round(model_load, 3),
+        "full_run": {
+            "runs": len(walls),
+            "p50_s": round(p50, 4),
+            "p95_s": round(_percentile(walls, 95), 4),
+            "min_s": round(min(walls), 4),
+            "resumes_per_sec": round(n / p50, 2) if p50 else 0.0,
+        },
+        "stages": {stage: _summary(values) for stage, values in sorted(samples.items())},
+        "peak_rss_mb": round(_peak_rss_mb(resource.RUSAGE_SELF), 1),
+        "peak_rss_children_mb": round(_peak_rss_mb(resource.RUSAGE_CHILDREN), 1),
+    }
+
+
+def _run_size(config: Dict[str, Any], stub_url: str, llm_batch_size: int, cache_dir: Path) -> Dict[str, Any]:
+    env = dict(os.environ, OPENROUTER_API_KEY="bench-stub", OPENROUTER_BASE_URL=stub_url,
+               LLM_CACHE="0", INDEX_RESUMES="0", LLM_BATCH_SIZE=str(llm_batch_size), PYTHONUNBUFFERED="1",
+               TEXT_CACHE_DIR=str(cache_dir))
+    out = subprocess.run([sys.executable, "-m", "benchmarks.bench_pipeline", "--child", json.dumps(config)],
+                         cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    if out.returncode != 0:
+        sys.exit(f"Benchmark run for {len(config['resumes'])} resumes failed:\n{out.stderr[-4000:]}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    for run in report["runs"]:
+        full = run["full_run"]
+        print(f"\n{run['resumes']} resumes: p50 {full['p50_s']:.2f}s  p95 {full['p95_s']:.2f}s  "
+              f"{full['resumes_per_sec']:.1f} resumes/s  peak RSS {run['peak_rss_mb']:.0f}MB "
+              f"(largest child {run['peak_rss_children_mb']:.0f}MB)  model load {run['model_load_s']:.2f}s")
+        print(f"  {'stage':<12} {'count':>7} {'p50 ms':>10} {'p95 ms':>10} {'total s':>9} {'per s':>10}")
+        for stage, s in run["stages"].items():
+            print(f"  {stage:<12} {s['count']:>7} {s['p50_ms']:>10.2f} {s['p95_ms']:>10.2f} "
+                  f"{s['total_s']:>9.2f} {s['per_sec']:>10.1f}")
+
+
+def _print_comparison(report: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """p50 ratio new/old per size and stage; below 1.0 is faster."""
+    old_runs = {r["resumes"]: r for r in baseline.get("runs", [])}
+    print(f"\nCompared with {baseline.get('meta', {}).get('git_commit') or 'baseline'} (new/old p50, <1 is faster)")
+    for run in report["runs"]:
+        old = old_runs.get(run["resumes"])
+        if old is None:
+            continue
+        rows = [("full_run", run["full_run"]["p50_s"], old["full_run"]["p50_s"])]
+        rows += [(stage, s["p50_ms"], old["stages"][stage]["p50_ms"])
+                 for stage, s in run["stages"].items() if stage in old["stages"]]
+        cells = [f"{name} x{new / prev:.2f}" for name, new, prev in rows if prev]
+        print(f"  {run['resumes']:>5} resumes: " + "  ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Resumes per run")
+    parser.add_argument("--repeat", type=int, default=3, help="Full runs per size")
+    parser.add_argument("--format", choices=("pdf", "docx", "mixed"), default="mixed")
+    parser.add_argument("--size", choices=(*SIZES, "mixed"), default="mixed", help="Resume length")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus", help="Folder to generate the corpus into (default: a temporary folder)")
+    parser.add_argument("--mode", choices=("serial", "process"), default="serial")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0, help="Delay of each stub LLM response")
+    parser.add_argument("--llm-batch-size", type=int, default=1, help="Candidates per LLM request (LLM_BATCH_SIZE)")
+    parser.add_argument("--llm-top-k", type=int, default=None, help="Only review the top K candidates")
+    parser.add_argument("--warm-cache", action="store_true", help="Keep the extracted-text cache between runs")
+    parser.add_argument("--output", help="Report path (default: benchmarks/results/pipeline-<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier report to compare against")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(json.loads(args.child))))
+        return
+
+    with tempfile.TemporaryDirectory(prefix="cvalign-bench-") as tmp:
+        corpus_dir = Path(args.corpus or tmp)
+        start = time.perf_counter()
+        corpus = generate_corpus(corpus_dir, max(args.sizes), 1, args.format, args.size, args.seed)
+        print(f"Generated {len(corpus['resumes'])} resumes in {time.perf_counter() - start:.1f}s ({corpus_dir})")
+
+        stub = llm_stub.start(latency_ms=args.llm_latency_ms)
+        try:
+            runs = []
+            for n in args.sizes:
+                config = {"jd": corpus["jds"][0], "resumes": corpus["resumes"][:n], "repeat": args.repeat,
+                          "mode": args.mode, "workers": args.workers, "llm_top_k": args.llm_top_k,
+                          "warm_cache": args.warm_cache}
+                print(f"Running {n} resumes x{args.repeat} ...", flush=True)
+                runs.append(_run_size(config, f"http://127.0.0.1:{stub.server_port}", args.llm_batch_size,
+                                      Path(tmp) / f"text-cache-{n}"))
+        finally:
+            stub.shutdown()
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("child", "compare", "output")},
+        },
+        "runs": runs,
+    }
+    _print_report(report)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            _print_comparison(report, json.load(f))
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"pipeline-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nSaved {output}")
+
+
+if __name__ == "__main__":
+    main()
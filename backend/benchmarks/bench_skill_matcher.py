@@ -0,0 +1,69 @@
+"""Skill extraction: the old per-keyword substring loop versus the compiled SkillMatcher.
+
+Usage (from backend/):
+    python -m benchmarks.bench_skill_matcher --docs 200 --extra-terms 5000
+
+--extra-terms pads the shipped taxonomy with synthetic skills to show how both approaches scale.
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.skill_matcher import build_skill_matcher, load_ambiguous_terms, load_taxonomy  # noqa: E402
+
+FILLER = (
+    "developed deployed maintained services for customers across the organisation worked with "
+    "interested digital teams to deliver features on time and improve reliability of the platform"
+).split()
+
+
+def substring_loop(terms, text):
+    txt = text.lower()
+    return sorted(kw for kw in terms if kw in txt)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--words", type=int, default=800)
+    parser.add_argument("--extra-terms", type=int, default=0)
+    args = parser.parse_args()
+
+    taxonomy = load_taxonomy()
+    if args.extra_terms:
+        taxonomy = dict(taxonomy)
+        taxonomy["synthetic"] = {f"skill{i:05d}": [f"skl{i:05d}"] for i in range(args.extra_terms)}
+    ambiguous = load_ambiguous_terms()
+    matcher = build_skill_matcher(taxonomy, ambiguous)
+    terms = [t for skills in taxonomy.values() for name, syns in skills.items() for t in [name, *syns]]
+
+    rng = random.Random(0)
+    vocab = FILLER + [rng.choice(terms) for _ in range(200)]
+    docs = [" ".join(rng.choice(vocab) for _ in range(args.words)) for _ in range(args.docs)]
+
+    start = time.perf_counter()
+    build_skill_matcher(taxonomy, ambiguous)
+    t_build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for d in docs:
+        substring_loop(terms, d)
+    t_loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for d in docs:
+        matcher.find(d)
+    t_match = time.perf_counter() - start
+
+    print(f"terms={len(terms)} docs={len(docs)} words/doc={args.words}")
+    print(f"matcher build:   {t_build * 1000:.1f} ms (once per process)")
+    print(f"substring loop:  {t_loop / len(docs) * 1000:.3f} ms/doc")
+    print(f"SkillMatcher:    {t_match / len(docs) * 1000:.3f} ms/doc (x{t_loop / t_match:.1f})")
+
+
+if __name__ == "__main__":
+    main()
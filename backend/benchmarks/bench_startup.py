@@ -0,0 +1,84 @@
+"""API startup time and resident memory with lazy versus preloaded spaCy model.
+
+Each run starts a fresh interpreter that imports main, runs the app lifespan (as uvicorn would)
+and then embeds one text, so the lazy mode's deferred model load shows up as first-request cost.
+The lifespan starts the job scheduler and batch GC, so every child gets its own empty DATA_DIR;
+it never touches the server's jobs database or uploads.
+
+Usage (from backend/):
+    python -m benchmarks.bench_startup --runs 3
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+CHILD = r"""
+import json, resource, time
+t0 = time.perf_counter()
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+import main
+t_import = time.perf_counter() - t0
+from fastapi.testclient import TestClient
+with TestClient(main.app):
+    t_ready = time.perf_counter() - t0
+    rss_ready = rss_mb()
+    from utils.matcher import get_embedding
+    t1 = time.perf_counter()
+    get_embedding("python developer with five years of backend experience")
+    t_first = time.perf_counter() - t1
+    rss_after = rss_mb()
+print(json.dumps({"import_s": t_import, "ready_s": t_ready, "first_embed_s": t_first,
+                  "rss_ready_mb": rss_ready, "rss_after_first_mb": rss_after}))
+"""
+
+
+def _run(preload: bool) -> dict:
+    with tempfile.TemporaryDirectory(prefix="cvalign-startup-") as data_dir:
+        env = dict(os.environ, MODEL_PRELOAD="1" if preload else "0", DATA_DIR=data_dir)
+        env.pop("TEXT_CACHE_DIR", None)  # keep the text cache inside DATA_DIR as well
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", CHILD], cwd=BACKEND_DIR, env=env,
+                             capture_output=True, text=True, check=True)
+        wall = time.perf_counter() - start
+    data = json.loads(out.stdout.strip().splitlines()[-1])
+    data["process_wall_s"] = wall
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per mode")
+    parser.add_argument("--json", action="store_true", help="Print raw medians as JSON")
+    args = parser.parse_args()
+
+    report = {}
+    for mode, preload in (("lazy", False), ("preload", True)):
+        runs = [_run(preload) for _ in range(args.runs)]
+        report[mode] = {k: statistics.median(r[k] for r in runs) for k in runs[0]}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{'mode':<8} {'import':>8} {'ready':>8} {'1st embed':>10} {'RSS ready':>10} {'RSS after':>10}")
+    for mode, r in report.items():
+        print(f"{mode:<8} {r['import_s']:>7.2f}s {r['ready_s']:>7.2f}s {r['first_embed_s']:>9.3f}s "
+              f"{r['rss_ready_mb']:>8.0f}MB {r['rss_after_first_mb']:>8.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Throughput of the CPU-bound resume scoring stages versus process-pool worker count.
+
+Usage (from backend/):
+    python -m benchmarks.bench_workers --jd path/to/jd.pdf --resumes path/to/cv_folder --workers 1 2 4 8
+
+The LLM stage is not exercised; only extraction, embedding and skill/education/experience scoring.
+Pass --no-cache so repeated runs measure parsing rather than text-cache hits; the runs then use a
+throwaway text cache (TEXT_CACHE_DIR) that is cleared before each worker count, never cache/text.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from resume.analysis import extract_skills_from_text, score_resumes  # noqa: E402
+from utils import text_cache  # noqa: E402
+from utils.extractor import extract_text  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jd", required=True)
+    parser.add_argument("--resumes", required=True, help="Folder of .pdf/.docx resumes (searched recursively)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=1, help="Replicate the resume list to enlarge the batch")
+    parser.add_argument("--no-cache", action="store_true", help="Use an empty throwaway text cache for each run")
+    args = parser.parse_args()
+
+    # Recursive, so the upload store's <sha256>/<name> layout works as well as a flat folder.
+    paths = sorted(str(p) for p in Path(args.resumes).rglob("*")
+                   if p.is_file() and p.suffix.lower() in (".pdf", ".docx") and ".incoming" not in p.parts)
+    paths = paths * args.repeat
+    if not paths:
+        sys.exit("No resumes found in " + args.resumes)
+
+    cache_dir = None
+    if args.no_cache:
+        # Set before the first pool starts, so process-mode workers import text_cache with it too.
+        cache_dir = tempfile.mkdtemp(prefix="cvalign-bench-text-")
+        os.environ["TEXT_CACHE_DIR"] = cache_dir
+        text_cache.TEXT_CACHE_DIR = Path(cache_dir)
+
+    jd_text = extract_text(args.jd)
+    jd_skills = extract_skills_from_text(jd_text)
+
+    try:
+        rows = []
+        baseline = None
+        for w in args.workers:
+            if cache_dir:
+                text_cache.clear()
+            mode = "serial" if w == 1 else "process"
+            start = time.perf_counter()
+            score_resumes(jd_text, jd_skills, paths, mode=mode, workers=w)
+            elapsed = time.perf_counter() - start
+            throughput = len(paths) / elapsed
+            baseline = baseline or throughput
+            rows.append({
+                "workers": w,
+                "resumes": len(paths),
+                "seconds": round(elapsed, 3),
+                "resumes_per_sec": round(throughput, 2),
+                "speedup": round(throughput / baseline, 2),
+            })
+            print(f"workers={w:<3} {len(paths)} resumes in {elapsed:.2f}s -> {throughput:.1f}/s (x{throughput / baseline:.2f})")
+    finally:
+        if cache_dir:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(json.dumps({"cpu_count": os.cpu_count(), "runs": rows}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
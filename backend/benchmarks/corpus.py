@@ -0,0 +1,220 @@
+"""Synthetic resume and JD corpus for benchmarks.
+
+Documents use the section headings, date ranges, degree lines and taxonomy skills the analysis
+pipeline looks for, so every stage does real work. PDFs are written directly (one Helvetica text
+stream per page, no extra dependency) and DOCX files with python-docx.
+
+Usage (from backend/):
+    python -m benchmarks.corpus --out /tmp/corpus --resumes 100 --jds 3 --format mixed --size mixed
+"""
+import argparse
+import json
+import random
+import textwrap
+from pathlib import Path
+from typing import Any, Dict, List
+
+from docx import Document
+
+TAXONOMY_PATH = Path(__file__).resolve().parent.parent / "data" / "skill_taxonomy.json"
+
+# Roles and bullet points per role for each resume size; "large" runs to several PDF pages.
+SIZES = {"small": (1, 3), "medium": (3, 5), "large": (8, 9)}
+FORMATS = ("pdf", "docx")
+
+FIRST_NAMES = ("Aarav", "Priya", "Rohan", "Ananya", "Vikram", "Sneha", "Arjun", "Meera", "Kabir", "Isha",
+               "Daniel", "Sofia", "Liam", "Emma", "Noah", "Olivia", "Lucas", "Mia", "Ethan", "Zara")
+LAST_NAMES = ("Sharma", "Patel", "Iyer", "Gupta", "Reddy", "Khan", "Mehta", "Nair", "Singh", "Das",
+              "Smith", "Garcia", "Muller", "Rossi", "Novak", "Kim", "Silva", "Cohen", "Brown", "Lee")
+TITLES = ("Software Engineer", "Backend Developer", "Data Scientist", "Machine Learning Engineer",
+          "Full Stack Developer", "DevOps Engineer", "Data Engineer", "Frontend Developer", "SDE Intern")
+COMPANIES = ("Infosys", "Flipkart", "Zomato", "Acme Corp", "Globex", "Initech", "Razorpay", "Swiggy",
+             "Freshworks", "Umbrella Labs", "Hooli", "Stark Industries")
+DEGREES = ("B.Tech in Computer Science", "B.E in Information Technology", "M.Tech in Data Science",
+           "B.Sc in Mathematics", "M.Sc in Computer Science", "Bachelor of Engineering", "MBA", "Ph.D in Machine Learning")
+INSTITUTIONS = ("Indian Institute of Technology Bombay", "IIT Delhi", "NIT Trichy", "Anna University",
+                "Vellore Institute of Technology", "Delhi College of Engineering", "University of Pune",
+                "National Institute of Technology Karnataka")
+COURSES = ("DSA", "OS", "DBMS", "ML", "AI", "NLP", "CN", "Algorithms", "Compilers", "Statistics")
+VERBS = ("Developed", "Designed", "Implemented", "Led", "Optimized", "Migrated", "Built", "Deployed",
+         "Automated", "Refactored", "Maintained", "Scaled")
+OBJECTS = ("a REST API serving 2M requests per day", "the payments reconciliation service",
+           "an event-driven data pipeline", "internal dashboards for the operations team",
+           "a recommendation model for the home feed", "CI/CD pipelines for twelve services",
+           "the search indexing workflow", "a real-time fraud detection system",
+           "the customer onboarding flow", "a multi-tenant analytics platform")
+OUTCOMES = ("cutting p95 latency by 40%", "reducing cloud spend by 25%", "improving conversion by 8%",
+            "with zero downtime", "mentoring two junior engineers", "ahead of the quarterly deadline",
+            "raising test coverage from 45% to 85%", "halving on-call incidents")
+MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+def load_skills(path: Path = TAXONOMY_PATH) -> List[str]:
+    """Canonical skill names from the taxonomy, so generated documents match the skill extractor.
+
+    Ambiguous names ("excel", "swift") are left out: the extractor only matches them qualified.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    ambiguous = set(data.get("ambiguous", []))
+    return sorted({skill for terms in data["categories"].values() for skill in terms} - ambiguous)
+
+
+def _bullet(rng: random.Random, skills: List[str]) -> str:
+    used = ", ".join(rng.sample(skills, 2))
+    return f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} using {used}, {rng.choice(OUTCOMES)}."
+
+
+def resume_sections(rng: random.Random, skills: List[str], size: str) -> Dict[str, Any]:
+    """One synthetic resume as a title line plus (heading, lines) sections."""
+    n_roles, n_bullets = SIZES[size]
+    own_skills = rng.sample(skills, rng.randint(6, 18))
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    end_year = 2024
+    experience: List[str] = []
+    for _ in range(n_roles):
+        span = rng.randint(1, 3)
+        start_year = end_year - span
+        end = "Present" if not experience else f"{rng.choice(MONTHS)} {end_year}"
+        experience.append(f"{rng.choice(TITLES)} | {rng.choice(COMPANIES)} | {rng.choice(MONTHS)} {start_year} - {end}")
+        experience.extend(f"- {_bullet(rng, own_skills)}" for _ in range(n_bullets))
+        end_year = start_year - rng.randint(0, 1)
+    grad_year = end_year - rng.randint(0, 1)
+    years = 2024 - end_year
+    education = [
+        f"{rng.choice(DEGREES)}, {rng.choice(INSTITUTIONS)} ({grad_year - 4} - {grad_year})",
+        f"CGPA: {rng.uniform(6.0, 9.8):.2f}",
+        "Relevant coursework: " + ", ".join(rng.sample(COURSES, 4)),
+    ]
+    projects = [f"- {_bullet(rng, own_skills)}" for _ in range(max(2, n_roles))]
+    return {
+        "title": name,
+        "contact": f"{name.lower().replace(' ', '.')}@example.com | +91 98{rng.randint(10000000, 99999999)}",
+        "sections": [
+            ("Summary", [f"{rng.choice(TITLES)} with {years}+ years of experience building production systems."]),
+            ("Technical Skills", [", ".join(own_skills)]),
+            ("Work Experience", experience),
+            ("Education", education),
+            ("Projects", projects),
+        ],
+    }
+
+
+def jd_sections(rng: random.Random, skills: List[str]) -> Dict[str, Any]:
+    title = rng.choice(TITLES)
+    required = rng.sample(skills, rng.randint(6, 12))
+    return {
+        "title": f"{title} - {rng.choice(COMPANIES)}",
+        "sections": [
+            ("About the role", [f"We are hiring a {title} to own services end to end, from design to on-call."]),
+            ("Requirements", [
+                f"{rng.randint(1, 8)}+ years of experience in software development.",
+                f"{rng.choice(DEGREES[:6])} or equivalent.",
+                "Strong skills in " + ", ".join(required) + ".",
+            ]),
+            ("Responsibilities", [f"- {_bullet(rng, required)}" for _ in range(5)]),
+        ],
+    }
+
+
+def _lines(doc: Dict[str, Any]) -> List[str]:
+    lines = [doc["title"], doc.get("contact", ""), ""]
+    for heading, body in doc["sections"]:
+        lines.append(heading)
+        lines.extend(body)
+        lines.append("")
+    return lines
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(doc: Dict[str, Any], path: Path, lines_per_page: int = 60, width: int = 95) -> None:
+    wrapped: List[str] = []
+    for line in _lines(doc):
+        wrapped.extend(textwrap.wrap(line, width) or [""])
+    pages = [wrapped[i:i + lines_per_page] for i in range(0, len(wrapped), lines_per_page)] or [[]]
+    font_id = 3 + 2 * len(pages)
+    objs = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+    objs.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    for i, page in enumerate(pages):
+        objs.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 {font_id} 0 R >> >> "
+                    f"/Contents {4 + 2 * i} 0 R >>".encode())
+        body = "BT /F1 9 Tf 40 810 Td 12.5 TL " + " ".join(f"({_pdf_escape(l)}) '" for l in page) + " ET"
+        content = body.encode("latin-1", "replace")
+        objs.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+    objs.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for n, obj in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % n + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    path.write_bytes(bytes(out))
+
+
+def write_docx(doc: Dict[str, Any], path: Path) -> None:
+    document = Document()
+    document.add_paragraph(doc["title"])
+    if doc.get("contact"):
+        document.add_paragraph(doc["contact"])
+    for heading, body in doc["sections"]:
+        document.add_paragraph(heading)
+        for line in body:
+            document.add_paragraph(line)
+    document.save(str(path))
+
+
+def _write(doc: Dict[str, Any], path: Path) -> None:
+    (write_pdf if path.suffix == ".pdf" else write_docx)(doc, path)
+
+
+def generate_corpus(out_dir: Path, n_resumes: int, n_jds: int = 1, fmt: str = "mixed", size: str = "mixed",
+                    seed: int = 0) -> Dict[str, List[str]]:
+    """Writes n_resumes resumes and n_jds JDs under out_dir and returns their paths.
+
+    The same seed always produces the same documents, so the first n resumes of a larger corpus
+    are identical to a smaller corpus generated with that seed.
+    """
+    out_dir = Path(out_dir)
+    (out_dir / "resumes").mkdir(parents=True, exist_ok=True)
+    (out_dir / "jds").mkdir(parents=True, exist_ok=True)
+    skills = load_skills()
+    paths: Dict[str, List[str]] = {"resumes": [], "jds": []}
+    for i in range(n_resumes):
+        rng = random.Random(f"{seed}:resume:{i}")
+        ext = rng.choice(FORMATS) if fmt == "mixed" else fmt
+        doc_size = rng.choice(tuple(SIZES)) if size == "mixed" else size
+        path = out_dir / "resumes" / f"resume_{i:05d}.{ext}"
+        _write(resume_sections(rng, skills, doc_size), path)
+        paths["resumes"].append(str(path))
+    for i in range(n_jds):
+        rng = random.Random(f"{seed}:jd:{i}")
+        ext = rng.choice(FORMATS) if fmt == "mixed" else fmt
+        path = out_dir / "jds" / f"jd_{i:03d}.{ext}"
+        _write(jd_sections(rng, skills), path)
+        paths["jds"].append(str(path))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True, help="Output folder (resumes/ and jds/ are created inside)")
+    parser.add_argument("--resumes", type=int, default=100)
+    parser.add_argument("--jds", type=int, default=1)
+    parser.add_argument("--format", choices=("pdf", "docx", "mixed"), default="mixed")
+    parser.add_argument("--size", choices=(*SIZES, "mixed"), default="mixed")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    paths = generate_corpus(Path(args.out), args.resumes, args.jds, args.format, args.size, args.seed)
+    print(f"Wrote {len(paths['resumes'])} resumes and {len(paths['jds'])} JDs to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Local stand-in for the OpenRouter chat completions API, so benchmarks run offline.
+
+Every POST gets a valid feedback JSON after a fixed delay, with one entry per <candidate id="...">
+in the prompt and token usage estimated from the prompt length. Point the backend at it with
+OPENROUTER_BASE_URL=http://127.0.0.1:<port>.
+
+Usage (from backend/):
+    python -m benchmarks.llm_stub --port 8765 --latency-ms 200
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FEEDBACK = {
+    "strengths": ["Relevant backend experience", "Matches most required skills", "Shipped production systems"],
+    "weaknesses": ["Limited cloud exposure", "No team lead experience", "Few quantified outcomes"],
+    "feedback": "Solid match for the role; worth a technical screen.",
+}
+CANDIDATE_ID_RE = re.compile(r'<candidate id="([^"]+)">')
+
+
+def _handler(latency: float):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            prompt = "".join(m.get("content", "") for m in body.get("messages", []))
+            if latency:
+                time.sleep(latency)
+            ids = CANDIDATE_ID_RE.findall(prompt) or ["1"]
+            content = json.dumps({"candidates": [dict(FEEDBACK, id=cid) for cid in ids]})
+            out = json.dumps({
+                "choices": [{"message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4},
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(out)))
+            self.end_headers()
+            self.wfile.write(out)
+
+    return Handler
+
+
+def start(port: int = 0, latency_ms: float = 0.0) -> ThreadingHTTPServer:
+    """Serves in a daemon thread; the bound port is server.server_port. Call shutdown() to stop."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), _handler(latency_ms / 1000))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="llm-stub", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    args = parser.parse_args()
+    server = start(args.port, args.latency_ms)
+    print(f"LLM stub listening on http://127.0.0.1:{server.server_port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
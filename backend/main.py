@@ -1,6 +1,11 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from resume import routes as resume_routes
+from utils import metrics
+from utils.matcher import warm_up
 import os # <-- ADD THIS IMPORT
 from pathlib import Path
 from dotenv import load_dotenv
@@ -9,9 +14,22 @@ from dotenv import load_dotenv
 env_path = Path(__file__).resolve().parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
+# "1" loads the spaCy model before serving; by default it loads on the first analysis.
+MODEL_PRELOAD = os.getenv("MODEL_PRELOAD", "0") == "1"
 
 
-app = FastAPI(title="CVAlign API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if MODEL_PRELOAD:
+        await run_in_threadpool(warm_up)
+    resume_routes.scheduler.start()
+    resume_routes.batch_store.start_gc()
+    yield
+    resume_routes.batch_store.stop_gc()
+    resume_routes.scheduler.stop()
+
+
+app = FastAPI(title="CVAlign API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -23,4 +41,10 @@ app.add_middleware(
 
 app.include_router(resume_routes.router, prefix="/resume", tags=["resume"])
 
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Stage timings, job queue/duration histograms, cache and LLM counters in Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 app.include_router(resume_routes.router, prefix="/resume")
\ No newline at end of file
@@ -1,105 +1,83 @@
 import json
 import os
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-import httpx
+from typing import List, Dict, Any, Callable, Optional, Union
+import numpy as np
 from dotenv import load_dotenv
 load_dotenv()
 
-from openai import OpenAI
-from utils.extractor import extract_text
-from utils.matcher import compute_similarity
+from utils.extractor import extract_text, extract_text_with_hit
+from utils.matcher import cosine_matrix, cosine_scores, embed_texts
+from utils.paths import BASE_DIR
+from utils.pools import DEFAULT_START_METHOD, pool_context
+from utils.section_parser import parse_resume
+from utils.skill_matcher import build_skill_matcher, load_ambiguous_terms, load_taxonomy
+from utils import metrics
+from utils.text_cache import file_digest
+from utils.vector_store import get_store
+from . import database
+from .feedback import generate_feedback
 
 from dotenv import load_dotenv
 load_dotenv()
 
-# Detect Hugging Face environment to use the correct writable directory
-RUNNING_IN_HF = "SPACE_ID" in os.environ
-
-if RUNNING_IN_HF:
-    BASE_DIR = Path("/tmp")  # Hugging Face can only write to /tmp
-else:
-    BASE_DIR = Path(__file__).resolve().parent.parent # Local dev: backend/
-
 # Define paths based on the dynamic BASE_DIR
 RESUMES_DIR = BASE_DIR / "uploaded_cvs"
 JDS_DIR = BASE_DIR / "uploaded_jds"
-RESULTS_FILE = BASE_DIR / "results" / "results.json" # This will now be /tmp/results/results.json on HF
-RECENT_UPLOADS_FILE = BASE_DIR / "cache" / "recent_uploads.json"
-COMMON_SKILLS = {
-    "python", "java", "javascript", "typescript", "react", "node", "django", "flask",
-    "fastapi", "sql", "postgres", "mongodb", "aws", "azure", "docker", "kubernetes",
-    "nlp", "pytorch", "tensorflow", "scikit-learn", "sklearn", "pandas", "numpy",
-    "git", "rest", "graphql"
-}
+
+# "serial" scores resumes in-process; "process" fans the CPU-bound stages out over a process pool.
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "serial")
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "0")) or (os.cpu_count() or 1)
+# Workers fork from a forkserver that has this module (and so the skill matcher) preloaded, so
+# they share it copy-on-write without inheriting the server's threads. Embedding stays in the parent.
+ANALYSIS_START_METHOD = os.getenv("ANALYSIS_START_METHOD", DEFAULT_START_METHOD)
+_POOL_CONTEXT = pool_context(ANALYSIS_START_METHOD, preload=[__name__])
+# Keep every analyzed resume's embedding in the persistent vector store for /resume/search.
+INDEX_RESUMES = os.getenv("INDEX_RESUMES", "1") == "1"
+
+NOT_REVIEWED_FEEDBACK = "Not reviewed: below the LLM review cut-off for this job. Request feedback to review this candidate."
+
+# Built once at import from the skill taxonomy (SKILL_TAXONOMY_PATH); shared by every request.
+SKILL_MATCHER = build_skill_matcher(load_taxonomy(), load_ambiguous_terms())
+COMMON_SKILLS = set(SKILL_MATCHER.canonical_names)
 
 def extract_skills_from_text(text: str) -> List[str]:
     if not text:
         return []
-    txt = text.lower()
-    found = [kw for kw in COMMON_SKILLS if kw in txt]
-    return sorted(found)
-
-def _clean_line(line: str) -> str:
-    line = re.sub(r"\S+@\S+", "", line)
-    line = re.sub(r"\s{2,}", " ", line).strip(" |:-\t")
-    return line.strip()
+    return SKILL_MATCHER.find(text)
 
 def extract_education_from_text(text: str) -> str:
-    if not text:
-        return "Unknown"
-    lines = [_clean_line(l) for l in text.splitlines() if l.strip()]
-    DEGREE_RE = r"(B\.?Tech|M\.?Tech|B\.?E|B\.?Sc|M\.?Sc|Bachelor|Master|Ph\.?D|MBA)"
-    INST_RE = r"(Indian Institute of Technology|IIT\s?-?\s?[A-Za-z]+|NIT\s?-?\s?[A-Za-z]+|National Institute of Technology|University|College|Institute of Technology)"
-    CGPA_RE = r"(?:CGPA|CPI)\s*:?\s*([0-9]\.\d{1,2})"
-    YEAR_RE = r"(\d{4}\s*-\s*\d{4}|\d{4}\s*-\s*Present)"
-    best_entry = {"score": 0, "text": ""}
-    for line in lines:
-        if not (re.search(DEGREE_RE, line, re.I) and re.search(INST_RE, line, re.I)):
-            continue
-        score, parts = 0, []
-        degree_match, inst_match, year_match, cgpa_match = re.search(DEGREE_RE, line, re.I), re.search(INST_RE, line, re.I), re.search(YEAR_RE, line, re.I), re.search(CGPA_RE, line, re.I)
-        if degree_match: score, parts = score + 2, parts + [degree_match.group(0).strip()]
-        if inst_match: score, parts = score + 2, parts + [inst_match.group(0).strip()]
-        if year_match: score, parts = score + 1, parts + [year_match.group(0).strip()]
-        if cgpa_match: score, parts = score + 1, parts + [cgpa_match.group(0).strip()]
-        if score > best_entry["score"]:
-            best_entry["score"], best_entry["text"] = score, " | ".join(parts)
-    return best_entry["text"] or "Unknown"
+    return parse_resume(text)["education"]
 
 def extract_experience_years_from_text(text: str) -> int:
-    if not text: return 0
-    m = re.search(r"(\d{1,2})\s*\+?\s*(years|yrs|y)", text, flags=re.IGNORECASE)
-    if m:
-        try: return int(m.group(1))
-        except Exception: return 0
-    m2 = re.search(r"experience[:\-]?\s*(\d{1,2})", text, flags=re.IGNORECASE)
-    if m2:
-        try: return int(m2.group(1))
-        except Exception: return 0
-    return 0
+    return parse_resume(text)["experience_years"]
 
 def jd_edu_match(jd_text: str, resume_edu: str) -> bool:
     jd_lower, edu_lower = (jd_text or "").lower(), (resume_edu or "").lower()
     keywords = ["bachelor", "master", "phd", "degree", "mba"]
     return any((k in jd_lower) and (k in edu_lower) for k in keywords)
 
-def score_education(resume_edu: str) -> float:
-    edu_lower = resume_edu.lower()
-    cgpa_score, branch_score, courses_score = 0.0, 0.5, 0.0
-    cgpa_match = re.search(r"(\d\.\d{1,2})", edu_lower)
-    if cgpa_match:
-        try:
-            cgpa_val = float(cgpa_match.group(1))
-            cgpa_score = min(cgpa_val / 10, 1.0)
-        except: pass
+CGPA_VALUE_RE = re.compile(r"(\d\.\d{1,2})")
+RELEVANT_COURSES = ("dsa", "os", "dbms", "ml", "ai", "nlp", "cn", "algo")
+
+def score_education(resume_edu: Union[str, Dict[str, Any]]) -> float:
+    """Scores an education summary string, or a parse_resume record (using its parsed CGPA)."""
+    if isinstance(resume_edu, dict):
+        edu_lower = (resume_edu.get("education") or "").lower()
+        cgpa_val = resume_edu.get("cgpa")
+    else:
+        edu_lower = resume_edu.lower()
+        cgpa_match = CGPA_VALUE_RE.search(edu_lower)
+        cgpa_val = float(cgpa_match.group(1)) if cgpa_match else None
+    cgpa_score = min(cgpa_val / 10, 1.0) if cgpa_val is not None else 0.0
     if "computer" in edu_lower or "cse" in edu_lower or "it" in edu_lower: branch_score = 1.0
     elif "electronics" in edu_lower or "ece" in edu_lower: branch_score = 0.7
     else: branch_score = 0.4
-    relevant_courses = {"dsa", "os", "dbms", "ml", "ai", "nlp", "cn", "algo"}
-    course_matches = sum(1 for c in relevant_courses if c in edu_lower)
-    courses_score = course_matches / max(len(relevant_courses), 1)
+    course_matches = sum(1 for c in RELEVANT_COURSES if c in edu_lower)
+    courses_score = course_matches / len(RELEVANT_COURSES)
     return (0.5 * cgpa_score + 0.3 * branch_score + 0.2 * courses_score) * 100
 
 def score_skills(candidate_skills: List[str], required_skills: List[str]) -> float:
@@ -111,43 +89,273 @@ def score_skills(candidate_skills: List[str], required_skills: List[str]) -> flo
     tie_break_bonus = min(len(candidate_skills) * 0.005, 0.05)
     return min((matched_score + 0.2 * extra_factor + tie_break_bonus) * 100, 100)
 
-def _load_recent_uploads() -> List[str]:
-    if RECENT_UPLOADS_FILE.exists():
+def _score_resume(resume_path: str, jd_text: str, jd_skills: List[str]) -> Dict[str, Any]:
+    """Per-resume CPU-bound stages. Top-level so it can be pickled into pool workers.
+
+    The semantic score is not computed here: score_resumes embeds all texts in one batch afterwards.
+    """
+    path = Path(resume_path)
+    # Stage timings travel back with the result so the parent process can record them.
+    timings: Dict[str, float] = {}
+    t0 = time.perf_counter()
+    try:
+        digest = file_digest(resume_path)
+        # Reported by this call itself: the global hit counter is shared by concurrent jobs.
+        resume_text, text_cache_hit = extract_text_with_hit(resume_path, digest=digest)
+    except Exception as e:
+        return {
+            "name": path.stem,
+            "original_filename": path.name,
+            "error": f"Could not extract text: {e}"
+        }
+    t1 = time.perf_counter()
+    timings["extract"] = t1 - t0
+
+    resume_skills = extract_skills_from_text(resume_text)
+    skill_score = score_skills(resume_skills, jd_skills)
+    t2 = time.perf_counter()
+    timings["skills"] = t2 - t1
+    # One pass over the lines yields both the education and the experience fields.
+    profile = parse_resume(resume_text)
+    t3 = time.perf_counter()
+    timings["parse"] = t3 - t2
+    resume_edu = profile["education"]
+    education_score = score_education(profile)
+    t4 = time.perf_counter()
+    timings["education"] = t4 - t3
+    resume_exp_years = profile["experience_years"]
+    experience_score = min((resume_exp_years / 10) * 100, 100)
+    timings["experience"] = time.perf_counter() - t4
+    return {
+        "path": resume_path,
+        "resume_id": digest,
+        "resume_text": resume_text,
+        "resume_skills": resume_skills,
+        "skill_score": skill_score,
+        "education": resume_edu,
+        "education_score": education_score,
+        "experience_years": resume_exp_years,
+        "experience_score": experience_score,
+        "timings": timings,
+        "text_cache_hit": text_cache_hit,
+    }
+
+def _record_resume_metrics(scored: Dict[str, Any]) -> None:
+    if "error" in scored:
+        metrics.RESUMES_PROCESSED.inc(outcome="error")
+        return
+    metrics.RESUMES_PROCESSED.inc(outcome="ok")
+    for stage, seconds in scored.pop("timings", {}).items():
+        metrics.STAGE_SECONDS.observe(seconds, stage=stage)
+    hit = scored.pop("text_cache_hit", False)
+    metrics.CACHE_REQUESTS.inc(cache="text", result="hit" if hit else "miss")
+
+def _score_resume_star(args):
+    return _score_resume(*args)
+
+# on_event(event, data) receives progress, per-candidate and feedback events while a job runs.
+EventCallback = Callable[[str, Dict[str, Any]], None]
+
+class AnalysisCancelled(Exception):
+    """Raised by an on_event callback to abort the analysis (e.g. the job was cancelled)."""
+
+def _emit(on_event: Optional[EventCallback], event: str, data: Dict[str, Any]) -> None:
+    if on_event is None:
+        return
+    try:
+        on_event(event, data)
+    except AnalysisCancelled:
+        raise
+    except Exception as e:
+        print(f"[ERROR] Event callback failed for {event}: {e}")
+
+
+def extract_resumes(
+    jd_text: str,
+    jd_skills: List[str],
+    resume_paths: List[str],
+    mode: Optional[str] = None,
+    workers: Optional[int] = None,
+    on_event: Optional[EventCallback] = None
+) -> List[Dict[str, Any]]:
+    """Runs _score_resume over all resumes, preserving input order in either execution mode."""
+    mode = mode or ANALYSIS_MODE
+    workers = workers or ANALYSIS_WORKERS
+    tasks = [(p, jd_text, jd_skills) for p in resume_paths]
+    total = len(tasks)
+    scored: List[Dict[str, Any]] = []
+    if mode != "process" or workers <= 1 or len(tasks) <= 1:
+        for t in tasks:
+            scored.append(_score_resume_star(t))
+            _record_resume_metrics(scored[-1])
+            _emit(on_event, "progress", {"stage": "extract", "done": len(scored), "total": total})
+    else:
+        workers = min(workers, len(tasks))
+        chunksize = max(1, len(tasks) // (workers * 4))
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=_POOL_CONTEXT)
         try:
-            return json.loads(RECENT_UPLOADS_FILE.read_text(encoding="utf-8"))
-        except Exception: return []
-    return []
+            # pool.map yields in input order as results arrive, so progress is reported incrementally.
+            for r in pool.map(_score_resume_star, tasks, chunksize=chunksize):
+                scored.append(r)
+                _record_resume_metrics(r)
+                _emit(on_event, "progress", {"stage": "extract", "done": len(scored), "total": total})
+        except AnalysisCancelled:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            pool.shutdown()
+    return scored
+
+def embed_resumes(scored: List[Dict[str, Any]]) -> Optional[np.ndarray]:
+    """One embedding row per successfully extracted resume (in order), also added to the vector store."""
+    ok = [r for r in scored if "error" not in r]
+    try:
+        with metrics.STAGE_SECONDS.time(stage="embed"):
+            resume_vecs = embed_texts([r["resume_text"] or "" for r in ok])
+    except Exception as e:
+        print(f"[ERROR] Batch embedding failed: {e}")
+        return None
+    if INDEX_RESUMES:
+        _index_resumes(ok, resume_vecs)
+    return resume_vecs
+
+def score_resumes(
+    jd_text: str,
+    jd_skills: List[str],
+    resume_paths: List[str],
+    mode: Optional[str] = None,
+    workers: Optional[int] = None,
+    on_event: Optional[EventCallback] = None
+) -> List[Dict[str, Any]]:
+    """extract_resumes, then semantic_score for the whole batch with the JD embedded once."""
+    scored = extract_resumes(jd_text, jd_skills, resume_paths, mode=mode, workers=workers, on_event=on_event)
+    total = len(scored)
+    _emit(on_event, "progress", {"stage": "embed", "done": 0, "total": total})
+    ok = [r for r in scored if "error" not in r]
+    resume_vecs = embed_resumes(scored)
+    try:
+        jd_vec = embed_texts([jd_text])[0] if jd_text else None
+        sims = cosine_scores(jd_vec, resume_vecs) if jd_vec is not None and resume_vecs is not None \
+            else [0.0] * len(ok)
+    except Exception as e:
+        print(f"[ERROR] Batch embedding failed: {e}")
+        sims = [0.0] * len(ok)
+    for r, sim in zip(ok, sims):
+        r["semantic_score"] = float(sim) * 100
+    return scored
 
-# In backend/resume/analysis.py
+def _index_resumes(scored: List[Dict[str, Any]], vectors) -> None:
+    try:
+        store = get_store()
+        for r, vec in zip(scored, vectors):
+            if r["resume_text"] and r["resume_id"] not in store:
+                path = Path(r["path"])
+                store.add(r["resume_id"], vec, path=str(path), name=path.stem)
+    except Exception as e:
+        print(f"[ERROR] Could not index resume embeddings: {e}")
+
+def select_for_review(
+    results: List[Dict[str, Any]],
+    candidates: List[int],
+    top_k: Optional[int] = None,
+    min_score: Optional[float] = None
+) -> set:
+    """Indices (into results) of the candidates that get LLM feedback: those scoring at least
+    min_score, capped to the top_k best. With neither set, every candidate is reviewed."""
+    ranked = sorted(candidates, key=lambda i: results[i].get("score", 0), reverse=True)
+    if min_score is not None:
+        ranked = [i for i in ranked if results[i].get("score", 0) >= min_score]
+    if top_k is not None:
+        ranked = ranked[:max(top_k, 0)]
+    return set(ranked)
+
+def _feedback_facts(resume_skills: List[str], jd_skills: List[str]) -> Dict[str, List[str]]:
+    """Skill overlap put in front of the compressed resume in the feedback prompt."""
+    return {"skills_matched": sorted(set(resume_skills) & set(jd_skills)),
+            "skills_missing": sorted(set(jd_skills) - set(resume_skills))}
+
+def review_candidate(jd_file_path: str, resume_file_path: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Generates LLM feedback for one previously unreviewed candidate and merges it into entry."""
+    jd_text = extract_text(jd_file_path)
+    resume_text = extract_text(resume_file_path)
+    facts = _feedback_facts(extract_skills_from_text(resume_text), extract_skills_from_text(jd_text))
+    feedback_data = generate_feedback(jd_text, [(Path(resume_file_path).name, resume_text, facts)])[0]
+    entry.update(feedback_data)
+    entry["raw_feedback"] = feedback_data.get("feedback", "")
+    entry["reviewed"] = True
+    return entry
+
+def skill_score_matrix(resume_skills: List[List[str]], jd_skills: List[List[str]]) -> np.ndarray:
+    """score_skills for every (resume, JD) pair at once, as an (n_resumes, n_jds) array."""
+    vocab: Dict[str, int] = {}
+    for skills in list(resume_skills) + list(jd_skills):
+        for skill in skills:
+            vocab.setdefault(skill.lower(), len(vocab))
+
+    def indicator(rows: List[List[str]]) -> np.ndarray:
+        m = np.zeros((len(rows), max(len(vocab), 1)), dtype=np.float64)
+        for i, skills in enumerate(rows):
+            m[i, [vocab[s.lower()] for s in skills]] = 1.0
+        return m
+
+    candidate, required = indicator(resume_skills), indicator(jd_skills)
+    matched = candidate @ required.T
+    n_candidate = candidate.sum(axis=1, keepdims=True)
+    n_required = np.maximum(required.sum(axis=1), 1)[None, :]
+    extra_factor = (n_candidate - matched) / n_required
+    tie_break_bonus = np.minimum(n_candidate * 0.005, 0.05)
+    return np.minimum((matched / n_required + 0.2 * extra_factor + tie_break_bonus) * 100, 100)
+
+def score_weights(weights: Dict[str, float]) -> np.ndarray:
+    """Skill, education and experience weights, in the column order used by combine_scores."""
+    return np.array([weights.get("skills", 50), weights.get("education", 20), weights.get("experience", 30)],
+                    dtype=np.float64)
+
+def combine_scores(components: np.ndarray, weights: Dict[str, float]) -> np.ndarray:
+    """Final scores for an (n, 3) array of skill/education/experience component scores."""
+    w = score_weights(weights)
+    total_weight = w.sum()
+    if total_weight == 0:
+        return np.zeros(len(components))
+    return components @ w / total_weight
+
+def rescore_job(job_id: str, weights: Dict[str, float]) -> List[Dict[str, Any]]:
+    """Re-ranks a finished job under new weights from its stored component scores.
+
+    Nothing is re-extracted or re-embedded and LLM feedback is kept as is; scores and ranks are
+    updated in the results store and the new ranking is returned.
+    """
+    rows = database.component_scores(job_id)
+    if not rows:
+        return []
+    components = np.array([r[3:] for r in rows], dtype=np.float64)
+    scores = np.round(combine_scores(np.nan_to_num(components), weights), 2)
+    order = np.argsort(-scores, kind="stable")  # ties keep the previous ranking
+    ranking, updates = [], []
+    for rank, i in enumerate(order.tolist(), start=1):
+        row_id, resume_id, name = rows[i][:3]
+        score = float(scores[i])
+        updates.append((score, rank, row_id))
+        ranking.append({"rank": rank, "name": name, "resume_id": resume_id, "score": score})
+    database.apply_scores(updates)
+    return ranking
 
 def analyze_all_resumes(
     jd_file_path: str,
     weights: Dict[str, float],
-    resume_file_paths: Optional[List[str]] = None
+    resume_file_paths: Optional[List[str]] = None,
+    mode: Optional[str] = None,
+    workers: Optional[int] = None,
+    llm_top_k: Optional[int] = None,
+    llm_min_score: Optional[float] = None,
+    on_event: Optional[EventCallback] = None
 ) -> List[Dict[str, Any]]:
+    """Scores and ranks resumes against a JD.
 
-    # ✅ --- IMPROVEMENT 1: ENHANCED LOGGING & CLIENT INITIALIZATION ---
-    client = None
-    api_key = os.getenv("OPENROUTER_API_KEY")
-
-    if not api_key:
-        print("[CRITICAL] OPENROUTER_API_KEY not found in environment variables.")
-    else:
-        # Mask the key for security in logs
-        print(f"[DEBUG] Found API key: sk-...{api_key[-4:]}")
-        try:
-            http_client = httpx.Client(timeout=30.0)  # removed invalid 'proxies' argument
-            client = OpenAI(
-                api_key=api_key,
-                base_url="https://openrouter.ai/api/v1",
-                http_client=http_client
-            )
-            print("[DEBUG] OpenAI client initialized successfully.")
-        except Exception as e:
-            print(f"[CRITICAL] Failed to create OpenAI client. EXCEPTION: {e}")
-            client = None
-    # --- END IMPROVEMENT 1 ---
-
+    Only the given resume_file_paths are scored; without them the result is empty.
+    llm_top_k / llm_min_score restrict LLM feedback to the best candidates by the cheap scores;
+    the rest are returned with reviewed=False and can be reviewed later via review_candidate.
+    """
     if isinstance(weights, str):
         try:
             weights = json.loads(weights.replace("'", "\""))
@@ -166,102 +374,45 @@ def analyze_all_resumes(
     jd_skills = extract_skills_from_text(jd_text)
     results: List[Dict[str, Any]] = []
 
-    if resume_file_paths is None:
-        resume_file_paths = _load_recent_uploads()
-        resume_file_paths = [str(RESUMES_DIR / p) for p in resume_file_paths]
-
-    resume_paths = [Path(p) for p in resume_file_paths if Path(p).is_file()]
+    # No implicit "newest batch" here: that may be another client's upload. Choosing a batch is
+    # the route's job (see ANALYZE_LATEST_BATCH_FALLBACK).
+    resume_paths = [Path(p) for p in resume_file_paths or [] if Path(p).is_file()]
 
     if not resume_paths:
-        RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
-        RESULTS_FILE.write_text("[]", encoding="utf-8")
         return []
 
-    for resume_path in resume_paths:
-        try:
-            resume_text = extract_text(str(resume_path))
-        except Exception as e:
-            results.append({
-                "name": resume_path.stem,
-                "original_filename": resume_path.name,
-                "error": f"Could not extract text: {e}"
-            })
+    w_s, w_e, w_x = score_weights(weights).tolist()
+    total_weight = w_s + w_e + w_x
+    # (index into results, file name, resume text, prompt facts) for every candidate that still needs LLM feedback
+    feedback_inputs = []
+
+    all_scored = score_resumes(jd_text, jd_skills, [str(p) for p in resume_paths],
+                               mode=mode, workers=workers, on_event=on_event)
+    for scored in all_scored:
+        if "error" in scored:
+            results.append(scored)
+            _emit(on_event, "candidate", dict(scored))
             continue
 
-        try:
-            semantic_score = compute_similarity(jd_text or "", resume_text or "") * 100
-        except Exception:
-            semantic_score = 0.0
-
-        resume_skills = extract_skills_from_text(resume_text)
-        skill_score = score_skills(resume_skills, jd_skills)
-        resume_edu = extract_education_from_text(resume_text)
-        education_score = score_education(resume_edu)
-        resume_exp_years = extract_experience_years_from_text(resume_text)
-        experience_score = min((resume_exp_years / 10) * 100, 100)
-
-        w_s = weights.get("skills", 50)
-        w_e = weights.get("education", 20)
-        w_x = weights.get("experience", 30)
-        total_weight = w_s + w_e + w_x
+        resume_path = Path(scored["path"])
+        resume_text = scored["resume_text"]
+        semantic_score = scored["semantic_score"]
+        resume_skills = scored["resume_skills"]
+        skill_score = scored["skill_score"]
+        resume_edu = scored["education"]
+        education_score = scored["education_score"]
+        resume_exp_years = scored["experience_years"]
+        experience_score = scored["experience_score"]
+
         if total_weight == 0:
             final_score = 0.0
         else:
             final_score = (w_s * skill_score + w_e * education_score + w_x * experience_score) / total_weight
 
-        feedback_data = {"strengths": [], "weaknesses": [], "feedback": ""}
-        if client:
-            try:
-                # ✅ --- IMPROVEMENT 2: MORE ROBUST PROMPT ---
-                feedback_prompt = f"""
-You are an expert HR analyst. Your task is to compare a candidate's resume against a job description.
-Provide your analysis in a structured JSON format.
-
-The job description is:
----
-{jd_text}
----
-
-The candidate's resume is:
----
-{resume_text}
----
-
-Based on the comparison, please provide 3 strengths and 3 weaknesses. Also, write a brief overall feedback summary.
-ONLY respond with a valid JSON object in the following format, with no other text before or after it:
-{{
-  "strengths": ["Strength 1", "Strength 2", "Strength 3"],
-  "weaknesses": ["Weakness 1", "Weakness 2", "Weakness 3"],
-  "feedback": "A short summary of the candidate's suitability."
-}}
-"""
-                # --- END IMPROVEMENT 2 ---
-
-                # ✅ --- IMPROVEMENT 3: MORE RESILIENT API CALL & PARSING ---
-                llm_resp = client.chat.completions.create(
-                    model="openai/gpt-4o-mini",
-                    messages=[{"role": "user", "content": feedback_prompt}],
-                    # REMOVED: response_format={"type": "json_object"}
-                    # This parameter is not universally supported and can cause silent failures.
-                    # It's more reliable to ask for JSON in the prompt and parse it.
-                )
-                
-                raw_content = llm_resp.choices[0].message.content
-                print(f"[DEBUG] Raw LLM response for {resume_path.name}: {raw_content}")
-
-                # Safely parse the JSON response from the string
-                feedback_data = json.loads(raw_content or "{}")
-
-            except Exception as e:
-                print(f"[ERROR] LLM feedback generation failed for {resume_path.name}: {e}")
-                feedback_data["feedback"] = f"Feedback generation failed: {e}"
-            # --- END IMPROVEMENT 3 ---
-        else:
-            feedback_data["feedback"] = "Feedback not available (API key missing or client failed to initialize)."
-
         results.append({
             "name": resume_path.stem,
             "original_filename": resume_path.name,
+            "resume_id": scored["resume_id"],
             "semantic_score": round(float(semantic_score), 2),
             "skills_matched": list(set(resume_skills) & set(jd_skills)),
             "skill_score": round(float(skill_score), 2),
@@ -270,13 +421,124 @@ ONLY respond with a valid JSON object in the following format, with no other tex
             "experience": f"{resume_exp_years} years",
             "experience_score": round(float(experience_score), 2),
             "score": round(float(final_score), 2),
-            **feedback_data,
-            "raw_feedback": feedback_data.get("feedback", "")
         })
+        feedback_inputs.append((len(results) - 1, resume_path.name, resume_text,
+                                _feedback_facts(resume_skills, jd_skills)))
+        _emit(on_event, "candidate", dict(results[-1]))
+
+    selected = select_for_review(results, [idx for idx, *_ in feedback_inputs], llm_top_k, llm_min_score)
+    to_review = [item for item in feedback_inputs if item[0] in selected]
+    for idx, *_ in feedback_inputs:
+        if idx not in selected:
+            results[idx].update({"strengths": [], "weaknesses": [], "feedback": NOT_REVIEWED_FEEDBACK})
+            results[idx]["raw_feedback"] = NOT_REVIEWED_FEEDBACK
+            results[idx]["reviewed"] = False
+
+    reviewed_count = 0
+
+    def on_feedback(i: int, feedback_data: Dict[str, Any]) -> None:
+        nonlocal reviewed_count
+        idx = to_review[i][0]
+        results[idx].update(feedback_data)
+        results[idx]["raw_feedback"] = feedback_data.get("feedback", "")
+        results[idx]["reviewed"] = True
+        reviewed_count += 1
+        _emit(on_event, "feedback", {"resume_id": results[idx]["resume_id"], "name": results[idx]["name"],
+                                     **feedback_data, "reviewed": True})
+        _emit(on_event, "progress", {"stage": "llm", "done": reviewed_count, "total": len(to_review)})
+
+    # Only timed when something is reviewed, so empty runs don't pull the llm stage histogram down.
+    if to_review:
+        _emit(on_event, "progress", {"stage": "llm", "done": 0, "total": len(to_review)})
+        with metrics.STAGE_SECONDS.time(stage="llm"):
+            generate_feedback(jd_text, [item[1:] for item in to_review], on_result=on_feedback)
 
     results.sort(key=lambda x: x.get("score", 0), reverse=True)
-    RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(RESULTS_FILE, "w", encoding="utf-8") as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
 
-    return results
\ No newline at end of file
+    return results
+
+def analyze_batch(
+    jd_file_paths: List[str],
+    weights: Dict[str, float],
+    resume_file_paths: List[str],
+    mode: Optional[str] = None,
+    workers: Optional[int] = None,
+    on_event: Optional[EventCallback] = None
+) -> Dict[str, Any]:
+    """Scores every resume against every JD, extracting and embedding each document once.
+
+    Returns the JDs, one ranking per JD (entries shaped like analyze_all_resumes results, without
+    LLM feedback), each candidate's best-fit JD, the final score matrix (rows follow "candidates",
+    columns follow "jds") and any per-resume extraction errors.
+    """
+    jds = []
+    for p in jd_file_paths:
+        try:
+            jd_text = extract_text(p)
+        except Exception as e:
+            print(f"[ERROR] Could not extract JD {p}: {e}")
+            jd_text = ""
+        jds.append({"name": Path(p).stem, "original_filename": Path(p).name, "text": jd_text,
+                    "skills": extract_skills_from_text(jd_text)})
+
+    resume_paths = [str(p) for p in resume_file_paths if Path(p).is_file()]
+    # JD-independent stages only: skill scores are recomputed below for every JD at once.
+    scored = extract_resumes("", [], resume_paths, mode=mode, workers=workers, on_event=on_event)
+    errors = [r for r in scored if "error" in r]
+    ok = [r for r in scored if "error" not in r]
+    _emit(on_event, "progress", {"stage": "embed", "done": 0, "total": len(ok) + len(jds)})
+
+    n_resumes, n_jds = len(ok), len(jds)
+    resume_vecs = embed_resumes(ok) if ok else None
+    if resume_vecs is not None and n_jds:
+        semantic = cosine_matrix(resume_vecs, embed_texts([jd["text"] for jd in jds])) * 100
+    else:
+        semantic = np.zeros((n_resumes, n_jds), dtype=np.float32)
+    skills = skill_score_matrix([r["resume_skills"] for r in ok], [jd["skills"] for jd in jds])
+    education = np.array([r["education_score"] for r in ok], dtype=np.float64)
+    experience = np.array([r["experience_score"] for r in ok], dtype=np.float64)
+    components = np.stack([skills, np.broadcast_to(education[:, None], skills.shape),
+                           np.broadcast_to(experience[:, None], skills.shape)], axis=-1)
+    final = combine_scores(components, weights) if n_resumes else np.zeros((0, n_jds))
+
+    rankings = []
+    for j, jd in enumerate(jds):
+        jd_skill_set = set(jd["skills"])
+        entries = []
+        for i, r in enumerate(ok):
+            path = Path(r["path"])
+            entries.append({
+                "name": path.stem,
+                "original_filename": path.name,
+                "resume_id": r["resume_id"],
+                "jd": jd["name"],
+                "semantic_score": round(float(semantic[i, j]), 2),
+                "skills_matched": sorted(set(r["resume_skills"]) & jd_skill_set),
+                "skill_score": round(float(skills[i, j]), 2),
+                "education": r["education"],
+                "education_score": round(float(education[i]), 2),
+                "experience": f"{r['experience_years']} years",
+                "experience_score": round(float(experience[i]), 2),
+                "score": round(float(final[i, j]), 2),
+            })
+        entries.sort(key=lambda x: x["score"], reverse=True)
+        rankings.append(entries)
+
+    best = final.argmax(axis=1) if n_jds else np.zeros(n_resumes, dtype=int)
+    best_fit = [
+        {"name": Path(r["path"]).stem, "resume_id": r["resume_id"],
+         "jd_index": int(best[i]) if n_jds else None,
+         "jd": jds[int(best[i])]["name"] if n_jds else None,
+         "score": round(float(final[i, best[i]]), 2) if n_jds else None}
+        for i, r in enumerate(ok)
+    ]
+    _emit(on_event, "progress", {"stage": "embed", "done": len(ok) + len(jds), "total": len(ok) + len(jds)})
+    return {
+        "jds": [{"name": jd["name"], "original_filename": jd["original_filename"], "skills": jd["skills"]}
+                for jd in jds],
+        "rankings": rankings,
+        "best_fit": best_fit,
+        "candidates": [b["name"] for b in best_fit],
+        "score_matrix": np.round(final, 2).tolist(),
+        "errors": errors,
+    }
@@ -0,0 +1,169 @@
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from utils.paths import BASE_DIR
+from .uploads import INCOMING_DIR, UPLOAD_DIR
+
+BATCHES_DB = BASE_DIR / "cache" / "batches.db"
+# Batches unused (no upload or analysis) for this long are deleted, with any files only they referenced.
+BATCH_TTL_SECONDS = float(os.getenv("BATCH_TTL_HOURS", "24")) * 3600
+BATCH_GC_INTERVAL = float(os.getenv("BATCH_GC_INTERVAL_SECONDS", "600"))
+# Unreferenced uploads younger than this are kept: they may belong to an upload still in progress.
+GC_GRACE_SECONDS = 3600
+
+_DIGEST_DIR_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class BatchStore:
+    """Upload batches in SQLite, so every worker process on the host sees the same batches.
+
+    A batch is the set of stored resumes one client uploaded; /resume/analyze takes its id.
+    """
+
+    def __init__(self, db_path: Path = BATCHES_DB, upload_dir: Path = UPLOAD_DIR,
+                 ttl_seconds: float = BATCH_TTL_SECONDS):
+        self.db_path = Path(db_path)
+        self.upload_dir = Path(upload_dir)
+        self.ttl_seconds = ttl_seconds
+        self._db_lock = threading.Lock()
+        self._gc_stop = threading.Event()
+        self._gc_thread: Optional[threading.Thread] = None
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # timeout: other processes may hold the write lock briefly.
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._db_lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS batches (
+                    id TEXT PRIMARY KEY,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS batch_files (
+                    batch_id TEXT NOT NULL REFERENCES batches(id) ON DELETE CASCADE,
+                    resume_id TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    added_at REAL NOT NULL,
+                    PRIMARY KEY (batch_id, resume_id)
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_batch_files_resume ON batch_files(resume_id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_batches_used ON batches(last_used_at)")
+
+    def create(self) -> str:
+        batch_id = uuid4().hex
+        now = time.time()
+        with self._db_lock, self._conn:
+            self._conn.execute("INSERT INTO batches (id, created_at, last_used_at) VALUES (?, ?, ?)",
+                               (batch_id, now, now))
+        return batch_id
+
+    def exists(self, batch_id: str) -> bool:
+        with self._db_lock:
+            return self._conn.execute("SELECT 1 FROM batches WHERE id=?", (batch_id,)).fetchone() is not None
+
+    def add(self, batch_id: str, files: List[Dict[str, Any]]) -> None:
+        """Adds stored uploads (as returned by uploads.save_upload) to a batch; re-adding a resume is a no-op."""
+        now = time.time()
+        with self._db_lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO batch_files (batch_id, resume_id, path, filename, added_at) VALUES (?, ?, ?, ?, ?)",
+                [(batch_id, f["resume_id"], f["path"], f["filename"], now) for f in files],
+            )
+            self._conn.execute("UPDATE batches SET last_used_at=? WHERE id=?", (now, batch_id))
+
+    def get(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        with self._db_lock:
+            row = self._conn.execute("SELECT * FROM batches WHERE id=?", (batch_id,)).fetchone()
+            if row is None:
+                return None
+            files = self._conn.execute(
+                "SELECT resume_id, path, filename FROM batch_files WHERE batch_id=? ORDER BY added_at, filename",
+                (batch_id,),
+            ).fetchall()
+        batch = dict(row)
+        batch["files"] = [dict(f) for f in files]
+        batch["expires_at"] = batch["last_used_at"] + self.ttl_seconds
+        return batch
+
+    def resume_paths(self, batch_id: str) -> Optional[List[str]]:
+        """Absolute paths of a batch's resumes, marking the batch as used. None for unknown batches."""
+        batch = self.get(batch_id)
+        if batch is None:
+            return None
+        with self._db_lock, self._conn:
+            self._conn.execute("UPDATE batches SET last_used_at=? WHERE id=?", (time.time(), batch_id))
+        return [str(self.upload_dir / f["path"]) for f in batch["files"]]
+
+    def latest(self) -> Optional[str]:
+        with self._db_lock:
+            row = self._conn.execute("SELECT id FROM batches ORDER BY created_at DESC LIMIT 1").fetchone()
+        return row["id"] if row else None
+
+    def delete(self, batch_id: str) -> bool:
+        with self._db_lock, self._conn:
+            return self._conn.execute("DELETE FROM batches WHERE id=?", (batch_id,)).rowcount > 0
+
+    def collect_garbage(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Drops expired batches, then stored resumes no batch references and stale partial uploads."""
+        now = now or time.time()
+        with self._db_lock, self._conn:
+            expired = self._conn.execute(
+                "DELETE FROM batches WHERE last_used_at < ?", (now - self.ttl_seconds,)
+            ).rowcount
+            referenced = {r["resume_id"] for r in self._conn.execute("SELECT DISTINCT resume_id FROM batch_files")}
+        removed = 0
+        grace_cutoff = now - GC_GRACE_SECONDS
+        if self.upload_dir.is_dir():
+            for entry in self.upload_dir.iterdir():
+                try:
+                    if entry.is_dir() and _DIGEST_DIR_RE.match(entry.name) and entry.name not in referenced \
+                            and entry.stat().st_mtime < grace_cutoff:
+                        shutil.rmtree(entry)
+                        removed += 1
+                except OSError as e:
+                    print(f"[WARN] Could not remove {entry}: {e}")
+        incoming = self.upload_dir / INCOMING_DIR.name
+        if incoming.is_dir():
+            for part in incoming.glob("*.part"):
+                try:
+                    if part.stat().st_mtime < grace_cutoff:
+                        part.unlink()
+                except OSError:
+                    pass
+        if expired or removed:
+            print(f"[DEBUG] Batch GC removed {expired} expired batch(es) and {removed} stored resume(s)")
+        return {"batches": expired, "files": removed}
+
+    def start_gc(self, interval: float = BATCH_GC_INTERVAL) -> None:
+        if self._gc_thread is not None:
+            return
+        self._gc_stop.clear()
+
+        def loop():
+            while not self._gc_stop.wait(interval):
+                try:
+                    self.collect_garbage()
+                except Exception as e:
+                    print(f"[ERROR] Batch GC failed: {e}")
+
+        self._gc_thread = threading.Thread(target=loop, name="batch-gc", daemon=True)
+        self._gc_thread.start()
+
+    def stop_gc(self) -> None:
+        self._gc_stop.set()
+        if self._gc_thread is not None:
+            self._gc_thread.join(5.0)
+        self._gc_thread = None
@@ -1,5 +1,198 @@
 # backend/resume/database.py
 
-# Dummy placeholder for database-related logic
-def save_analysis_result(result: dict):
-    print("Pretend saving result to DB:", result)
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.paths import BASE_DIR
+
+RESULTS_DB = Path(os.getenv("RESULTS_DB", str(BASE_DIR / "results_sql" / "resumes.db")))
+
+SORTABLE_COLUMNS = {"score", "semantic_score", "skill_score", "education_score", "experience_score", "name", "rank"}
+MAX_PAGE_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidate_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    rank INTEGER,
+    resume_id TEXT,
+    name TEXT,
+    original_filename TEXT,
+    semantic_score REAL,
+    skill_score REAL,
+    education_score REAL,
+    experience_score REAL,
+    score REAL,
+    reviewed INTEGER,
+    error TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_job_score ON candidate_results(job_id, score DESC);
+CREATE INDEX IF NOT EXISTS idx_results_job_resume ON candidate_results(job_id, resume_id);
+CREATE TABLE IF NOT EXISTS candidate_skills (
+    result_id INTEGER NOT NULL REFERENCES candidate_results(id) ON DELETE CASCADE,
+    job_id TEXT NOT NULL,
+    skill TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_skills_job_skill ON candidate_skills(job_id, skill, result_id);
+CREATE TABLE IF NOT EXISTS job_summaries (
+    job_id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL
+);
+"""
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = set()
+
+
+def _connect() -> sqlite3.Connection:
+    """One connection per thread; WAL lets readers page through results while a job is writing."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None and getattr(_local, "path", None) == RESULTS_DB:
+        return conn
+    RESULTS_DB.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(RESULTS_DB))
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    with _init_lock:
+        if RESULTS_DB not in _initialized:
+            conn.executescript(_SCHEMA)
+            _initialized.add(RESULTS_DB)
+    _local.conn, _local.path = conn, RESULTS_DB
+    return conn
+
+
+def _row_values(job_id: str, rank: Optional[int], result: Dict[str, Any]) -> tuple:
+    return (
+        job_id, rank, result.get("resume_id"), result.get("name"), result.get("original_filename"),
+        result.get("semantic_score"), result.get("skill_score"), result.get("education_score"),
+        result.get("experience_score"), result.get("score"),
+        None if "reviewed" not in result else int(bool(result["reviewed"])),
+        result.get("error"), json.dumps(result, ensure_ascii=False),
+    )
+
+
+_INSERT = """INSERT INTO candidate_results
+    (job_id, rank, resume_id, name, original_filename, semantic_score, skill_score, education_score,
+     experience_score, score, reviewed, error, payload)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+
+def save_job_results(job_id: str, results: List[Dict[str, Any]]) -> None:
+    """Replaces a job's rows with one row per candidate, in a single transaction."""
+    conn = _connect()
+    with conn:
+        conn.execute("DELETE FROM candidate_results WHERE job_id=?", (job_id,))
+        conn.executemany(_INSERT, [_row_values(job_id, i + 1, r) for i, r in enumerate(results)])
+        rows = conn.execute("SELECT id, payload FROM candidate_results WHERE job_id=?", (job_id,)).fetchall()
+        skills = [
+            (row["id"], job_id, skill.lower())
+            for row in rows
+            for skill in json.loads(row["payload"]).get("skills_matched") or []
+        ]
+        conn.executemany("INSERT INTO candidate_skills (result_id, job_id, skill) VALUES (?, ?, ?)", skills)
+
+
+def save_analysis_result(result: dict, job_id: str = "adhoc"):
+    """Appends a single candidate row outside a full job save."""
+    conn = _connect()
+    with conn:
+        cur = conn.execute(_INSERT, _row_values(job_id, None, result))
+        conn.executemany(
+            "INSERT INTO candidate_skills (result_id, job_id, skill) VALUES (?, ?, ?)",
+            [(cur.lastrowid, job_id, s.lower()) for s in result.get("skills_matched") or []],
+        )
+
+
+def save_job_summary(job_id: str, summary: Dict[str, Any]) -> None:
+    """Job-level output that isn't one row per candidate (e.g. a multi-JD batch's score matrix)."""
+    conn = _connect()
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO job_summaries (job_id, payload) VALUES (?, ?)",
+                     (job_id, json.dumps(summary, ensure_ascii=False)))
+
+
+def get_job_summary(job_id: str) -> Optional[Dict[str, Any]]:
+    row = _connect().execute("SELECT payload FROM job_summaries WHERE job_id=?", (job_id,)).fetchone()
+    return json.loads(row["payload"]) if row else None
+
+
+def has_results(job_id: str) -> bool:
+    row = _connect().execute("SELECT 1 FROM candidate_results WHERE job_id=? LIMIT 1", (job_id,)).fetchone()
+    return row is not None
+
+
+def query_results(
+    job_id: str,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    sort: str = "score",
+    order: str = "desc",
+    min_score: Optional[float] = None,
+    skill: Optional[str] = None,
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """A page of a job's candidates plus the total number matching the filters."""
+    if sort not in SORTABLE_COLUMNS:
+        raise ValueError(f"Cannot sort by {sort!r}")
+    direction = "ASC" if order.lower() == "asc" else "DESC"
+    where, args = ["r.job_id = ?"], [job_id]
+    if min_score is not None:
+        where.append("r.score >= ?")
+        args.append(min_score)
+    if skill:
+        where.append("r.id IN (SELECT result_id FROM candidate_skills WHERE job_id = ? AND skill = ?)")
+        args.extend([job_id, skill.lower()])
+    clause = " AND ".join(where)
+    conn = _connect()
+    total = conn.execute(f"SELECT COUNT(*) FROM candidate_results r WHERE {clause}", args).fetchone()[0]
+    # Error rows have no score; keep them after scored candidates regardless of direction.
+    query = (f"SELECT r.payload FROM candidate_results r WHERE {clause} "
+             f"ORDER BY r.{sort} IS NULL, r.{sort} {direction}, r.rank ASC")
+    page_args = list(args)
+    if limit is not None:
+        query += " LIMIT ? OFFSET ?"
+        page_args.extend([max(1, min(limit, MAX_PAGE_SIZE)), max(0, offset)])
+    rows = conn.execute(query, page_args).fetchall()
+    return total, [json.loads(r["payload"]) for r in rows]
+
+
+def get_result(job_id: str, resume_id: str) -> Optional[Dict[str, Any]]:
+    row = _connect().execute(
+        "SELECT payload FROM candidate_results WHERE job_id=? AND resume_id=?", (job_id, resume_id)
+    ).fetchone()
+    return json.loads(row["payload"]) if row else None
+
+
+def update_result(job_id: str, resume_id: str, result: Dict[str, Any]) -> None:
+    conn = _connect()
+    with conn:
+        conn.execute(
+            "UPDATE candidate_results SET reviewed=?, payload=? WHERE job_id=? AND resume_id=?",
+            (int(bool(result.get("reviewed"))), json.dumps(result, ensure_ascii=False), job_id, resume_id),
+        )
+
+
+def component_scores(job_id: str) -> List[Tuple[int, str, str, float, float, float]]:
+    """(row id, resume_id, name, skill, education, experience score) for a job's scored candidates."""
+    return [tuple(r) for r in _connect().execute(
+        "SELECT id, resume_id, name, skill_score, education_score, experience_score FROM candidate_results "
+        "WHERE job_id=? AND score IS NOT NULL ORDER BY rank",
+        (job_id,),
+    )]
+
+
+def apply_scores(updates: List[Tuple[float, int, int]]) -> None:
+    """Writes (score, rank, row id) triples back, keeping the stored entry's score in step."""
+    conn = _connect()
+    with conn:
+        conn.executemany(
+            "UPDATE candidate_results SET score=?1, rank=?2, payload=json_set(payload, '$.score', ?1) WHERE id=?3",
+            updates,
+        )
@@ -1,13 +1,30 @@
+from utils.skill_matcher import SkillMatcher
+
+technical_keywords = ["python", "java", "c++", "javascript", "node.js", "sql", "html", "css", "react", "cloud", "github"]
+marketing_keywords = ["marketing", "digital marketing", "seo", "campaign", "sales", "branding", "analytics"]
+design_keywords = ["figma", "adobe", "illustrator", "ux", "ui", "wireframe", "wireframes", "photoshop"]
+
+# Matching is on whole words, so inflected forms that the old substring checks caught are listed explicitly.
+jd_technical_keywords = ["developer", "developers", "engineer", "engineers", "engineering", "software",
+                         "full stack", "backend", "frontend", "node.js", "python"]
+jd_marketing_keywords = ["marketing", "seo", "sales", "customer", "customers", "brand", "branding",
+                         "campaign", "campaigns"]
+jd_design_keywords = ["ux", "ui", "figma", "design", "designer", "designers", "designing", "prototype", "prototyping"]
+
+# Compiled once at import; each classification is a single pass per domain.
+_TECH_MATCHER = SkillMatcher.from_keywords(technical_keywords)
+_MARKETING_MATCHER = SkillMatcher.from_keywords(marketing_keywords)
+_DESIGN_MATCHER = SkillMatcher.from_keywords(design_keywords)
+_JD_TECH_MATCHER = SkillMatcher.from_keywords(jd_technical_keywords)
+_JD_MARKETING_MATCHER = SkillMatcher.from_keywords(jd_marketing_keywords)
+_JD_DESIGN_MATCHER = SkillMatcher.from_keywords(jd_design_keywords)
+
 def classify_resume_domain(text: str) -> dict:
-    text_lower = text.lower()
     domain = "Unknown"
-    technical_keywords = ["python", "java", "c++", "javascript", "node.js", "sql", "html", "css", "react", "cloud", "github"]
-    marketing_keywords = ["marketing", "digital marketing", "seo", "campaign", "sales", "branding", "analytics"]
-    design_keywords = ["figma", "adobe", "illustrator", "ux", "ui", "wireframe", "photoshop"]
 
-    tech_score = sum(1 for kw in technical_keywords if kw in text_lower)
-    marketing_score = sum(1 for kw in marketing_keywords if kw in text_lower)
-    design_score = sum(1 for kw in design_keywords if kw in text_lower)
+    tech_score = len(_TECH_MATCHER.find(text))
+    marketing_score = len(_MARKETING_MATCHER.find(text))
+    design_score = len(_DESIGN_MATCHER.find(text))
 
     if tech_score > max(marketing_score, design_score) and tech_score > 2:
         domain = "Technical"
@@ -24,11 +41,10 @@ def classify_resume_domain(text: str) -> dict:
     }
 
 def classify_jd_domain(jd_text: str) -> str:
-    jd_text = jd_text.lower()
-    if any(k in jd_text for k in ["developer", "engineer", "software", "full stack", "backend", "frontend", "node.js", "python"]):
+    if _JD_TECH_MATCHER.contains_any(jd_text):
         return "Technical"
-    elif any(k in jd_text for k in ["marketing", "seo", "sales", "customer", "brand", "campaign"]):
+    elif _JD_MARKETING_MATCHER.contains_any(jd_text):
         return "Marketing"
-    elif any(k in jd_text for k in ["ux", "ui", "figma", "design", "prototype"]):
+    elif _JD_DESIGN_MATCHER.contains_any(jd_text):
         return "Design"
     return "Unknown"
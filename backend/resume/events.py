@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Set, Tuple
+
+# How long a finished job's events stay available for late subscribers.
+EVENT_RETENTION_SECONDS = 15 * 60
+
+
+class JobEvents:
+    """In-process, append-only event log per job.
+
+    Analysis runs on worker threads and publishes; streaming endpoints read from a cursor,
+    so a client that reconnects (SSE Last-Event-ID) resumes where it left off. Subscribers wait
+    on an asyncio.Event that publish() sets on the subscriber's loop, so an open stream holds
+    no thread while it waits.
+    """
+
+    def __init__(self):
+        self._events: Dict[str, List[Dict[str, Any]]] = {}
+        self._closed: Dict[str, float] = {}
+        self._subscribers: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+        self._lock = threading.Lock()
+
+    def open(self, job_id: str) -> None:
+        with self._lock:
+            self._events.setdefault(job_id, [])
+            self._prune()
+
+    def publish(self, job_id: str, event: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            events = self._events.setdefault(job_id, [])
+            events.append({"id": len(events), "event": event, "data": data})
+            self._wake(job_id)
+
+    def close(self, job_id: str) -> None:
+        with self._lock:
+            self._events.setdefault(job_id, [])
+            self._closed[job_id] = time.monotonic()
+            self._wake(job_id)
+
+    def known(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._events
+
+    def _wake(self, job_id: str) -> None:
+        # Called with the lock held, from any thread; each subscriber's Event is set on its own loop.
+        for loop, wakeup in self._subscribers.get(job_id, ()):
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                pass  # loop already closed; its subscriber is gone
+
+    async def wait(self, job_id: str, cursor: int, timeout: float) -> Tuple[List[Dict[str, Any]], bool]:
+        """Events from cursor on, waiting up to timeout for new ones. Also returns whether the job is closed."""
+        subscriber = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            events = self._events.get(job_id, [])
+            closed = job_id in self._closed
+            if len(events) > cursor or closed:
+                return events[cursor:], closed
+            self._subscribers.setdefault(job_id, set()).add(subscriber)
+        try:
+            await asyncio.wait_for(subscriber[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                waiting = self._subscribers.get(job_id)
+                if waiting is not None:
+                    waiting.discard(subscriber)
+                    if not waiting:
+                        del self._subscribers[job_id]
+        with self._lock:
+            return self._events.get(job_id, [])[cursor:], job_id in self._closed
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - EVENT_RETENTION_SECONDS
+        for job_id in [j for j, t in self._closed.items() if t < cutoff]:
+            self._events.pop(job_id, None)
+            self._closed.pop(job_id, None)
+
+
+JOB_EVENTS = JobEvents()
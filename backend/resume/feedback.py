@@ -0,0 +1,276 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from utils import metrics
+from utils.paths import BASE_DIR
+from .prompts import FEEDBACK_RESPONSE_FORMAT, PROMPT_VERSION, SYSTEM_TEMPLATE, PromptBuilder
+
+LLM_CACHE_DIR = BASE_DIR / "cache" / "llm"
+
+# Point OPENROUTER_BASE_URL at a local stub server to exercise this module offline.
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+LLM_MODEL = os.getenv("LLM_MODEL", "openai/gpt-4o-mini")
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "8"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") == "1"
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Candidates per LLM request. Above 1, several candidates share one structured-output call
+# (fewer round-trips and one copy of the JD prefix per request instead of per candidate).
+LLM_BATCH_SIZE = max(1, int(os.getenv("LLM_BATCH_SIZE", "1")))
+# Send a JSON schema as response_format; turn off for models/providers that reject it.
+LLM_STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "1") == "1"
+
+MISSING_KEY_FEEDBACK = "Feedback not available (API key missing or client failed to initialize)."
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+PROMPT_TEMPLATE_HASH = _sha(f"{PROMPT_VERSION}:{SYSTEM_TEMPLATE}")
+
+
+def feedback_cache_key(prefix: str, candidate_block: str, model: str) -> str:
+    """Per candidate, independent of which other candidates share its request."""
+    return _sha(f"{model}:{PROMPT_TEMPLATE_HASH}:{_sha(prefix)}:{_sha(candidate_block)}")
+
+
+def _cache_get(key: str) -> Optional[Dict[str, Any]]:
+    p = LLM_CACHE_DIR / key[:2] / f"{key}.json"
+    try:
+        return json.loads(p.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _cache_put(key: str, data: Dict[str, Any]) -> None:
+    p = LLM_CACHE_DIR / key[:2] / f"{key}.json"
+    try:
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, p)
+    except OSError as e:
+        print(f"[WARN] Could not write LLM cache entry {key}: {e}")
+
+
+def parse_feedback(raw_content: Optional[str]) -> Dict[str, Any]:
+    """Parses the model's JSON answer, tolerating a surrounding ```json fence."""
+    content = (raw_content or "").strip()
+    if content.startswith("```"):
+        content = content.strip("`")
+        if content.lower().startswith("json"):
+            content = content[4:]
+    data = json.loads(content or "{}")
+    if not isinstance(data, dict):
+        raise ValueError("LLM response is not a JSON object")
+    return data
+
+
+def parse_batch_feedback(raw_content: Optional[str], ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Feedback per candidate id from a {"candidates": [...]} answer. Ids the model left out are missing.
+
+    A bare single-candidate object is accepted too when only one candidate was asked about.
+    """
+    data = parse_feedback(raw_content)
+    items = data.get("candidates")
+    if not isinstance(items, list):
+        if len(ids) == 1 and "feedback" in data:
+            return {ids[0]: data}
+        raise ValueError("LLM response has no candidates list")
+    found: Dict[str, Dict[str, Any]] = {}
+    for item in items:
+        if isinstance(item, dict) and str(item.get("id")) in ids:
+            found[str(item["id"])] = {k: item.get(k, default) for k, default in
+                                      (("strengths", []), ("weaknesses", []), ("feedback", ""))}
+    return found
+
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response]) -> float:
+    if response is not None:
+        retry_after = response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return min(float(retry_after), 60.0)
+            except ValueError:
+                pass
+    return LLM_BACKOFF_BASE * (2 ** attempt) + random.uniform(0, LLM_BACKOFF_BASE)
+
+
+async def _complete(client: httpx.AsyncClient, messages: List[Dict[str, str]], model: str, max_retries: int,
+                    response_format: Optional[Dict[str, Any]] = None) -> str:
+    """One chat completion, retried with exponential backoff on 429/5xx and transport errors."""
+    payload: Dict[str, Any] = {"model": model, "messages": messages}
+    if response_format:
+        payload["response_format"] = response_format
+    attempt = 0
+    while True:
+        response = None
+        start = time.perf_counter()
+        try:
+            response = await client.post("/chat/completions", json=payload)
+            metrics.LLM_LATENCY.observe(time.perf_counter() - start)
+            if response.status_code not in RETRY_STATUS:
+                response.raise_for_status()
+                data = response.json()
+                usage = data.get("usage") or {}
+                for kind in ("prompt_tokens", "completion_tokens"):
+                    if usage.get(kind):
+                        metrics.LLM_TOKENS.inc(usage[kind], kind=kind.split("_")[0])
+                metrics.LLM_REQUESTS.inc(outcome="ok")
+                return data["choices"][0]["message"]["content"]
+            error: Exception = httpx.HTTPStatusError(
+                f"HTTP {response.status_code}", request=response.request, response=response
+            )
+        except httpx.HTTPStatusError:
+            metrics.LLM_REQUESTS.inc(outcome="error")
+            raise
+        except (httpx.TransportError, httpx.TimeoutException) as e:
+            error = e
+        if attempt >= max_retries:
+            metrics.LLM_REQUESTS.inc(outcome="error")
+            raise error
+        metrics.LLM_REQUESTS.inc(outcome="retry")
+        delay = _retry_delay(attempt, response)
+        print(f"[WARN] LLM request failed ({error}); retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+async def _feedback_batch(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    builder: PromptBuilder,
+    batch: List[Tuple[int, str, str]],
+    model: str,
+    max_retries: int,
+) -> Tuple[Dict[int, Dict[str, Any]], set]:
+    """One request for a batch of (index, name, candidate block).
+
+    Returns feedback by index and the indices whose feedback is an error message (not to be cached).
+    Candidates a batched answer leaves out (or all of them, if it can't be parsed) are retried on their own.
+    """
+    ids = [str(n) for n in range(1, len(batch) + 1)]
+    messages = builder.messages(ids, [block for _, _, block in batch])
+    tokens = builder.token_report(messages)
+    metrics.LLM_PROMPT_TOKENS.observe(tokens["prefix"], part="prefix")
+    metrics.LLM_PROMPT_TOKENS.observe(tokens["candidates"], part="candidates")
+    names = ", ".join(name for _, name, _ in batch)
+    print(f"[DEBUG] LLM request for {names}: ~{tokens['total']} prompt tokens "
+          f"({tokens['prefix']} shared prefix + {tokens['candidates']} candidates)")
+    try:
+        async with semaphore:
+            raw_content = await _complete(client, messages, model, max_retries,
+                                          FEEDBACK_RESPONSE_FORMAT if LLM_STRUCTURED_OUTPUT else None)
+        print(f"[DEBUG] Raw LLM response for {names}: {raw_content}")
+        by_id = parse_batch_feedback(raw_content, ids)
+    except Exception as e:
+        if not isinstance(e, ValueError) or len(batch) == 1:
+            print(f"[ERROR] LLM feedback generation failed for {names}: {e}")
+            return ({idx: {"strengths": [], "weaknesses": [], "feedback": f"Feedback generation failed: {e}"}
+                     for idx, _, _ in batch}, {idx for idx, _, _ in batch})
+        # The model answered but not in the batch format: ask about each candidate on its own.
+        print(f"[WARN] Unusable batched LLM response for {names} ({e})")
+        by_id = {}
+    results = {idx: by_id[cid] for cid, (idx, _, _) in zip(ids, batch) if cid in by_id}
+    failed: set = set()
+    missing = [item for cid, item in zip(ids, batch) if cid not in by_id]
+    if missing and len(batch) > 1:
+        print(f"[WARN] Batched LLM response is missing {len(missing)} candidate(s); asking for them individually")
+        retried = await asyncio.gather(*(_feedback_batch(client, semaphore, builder, [item], model, max_retries)
+                                         for item in missing))
+        for r, f in retried:
+            results.update(r)
+            failed |= f
+    elif missing:
+        results[batch[0][0]] = {"strengths": [], "weaknesses": [],
+                                "feedback": "Feedback generation failed: candidate missing from LLM response"}
+        failed.add(batch[0][0])
+    return results, failed
+
+
+async def generate_feedback_async(
+    jd_text: str,
+    candidates: List[Tuple],
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None,
+    model: Optional[str] = None,
+    concurrency: Optional[int] = None,
+    max_retries: Optional[int] = None,
+    use_cache: Optional[bool] = None,
+    batch_size: Optional[int] = None,
+    on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+) -> List[Dict[str, Any]]:
+    """Feedback for each candidate, in input order, with at most `concurrency` requests in flight.
+
+    Candidates are (name, resume_text) or (name, resume_text, facts), where facts may carry the
+    "skills_matched" and "skills_missing" lists to put in front of the compressed resume.
+    Up to `batch_size` uncached candidates share one request.
+    on_result(index, feedback) is called as each candidate's feedback completes, in completion order.
+    """
+    api_key = api_key or os.getenv("OPENROUTER_API_KEY")
+    if not api_key:
+        print("[CRITICAL] OPENROUTER_API_KEY not found in environment variables.")
+        missing = [{"strengths": [], "weaknesses": [], "feedback": MISSING_KEY_FEEDBACK} for _ in candidates]
+        if on_result:
+            for i, data in enumerate(missing):
+                on_result(i, data)
+        return missing
+    model = model or LLM_MODEL
+    max_retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+    use_cache = LLM_CACHE_ENABLED if use_cache is None else use_cache
+    batch_size = max(1, batch_size or LLM_BATCH_SIZE)
+    semaphore = asyncio.Semaphore(max(1, concurrency or LLM_CONCURRENCY))
+    builder = PromptBuilder(jd_text)
+    results: List[Optional[Dict[str, Any]]] = [None] * len(candidates)
+
+    def finish(i: int, data: Dict[str, Any]) -> None:
+        results[i] = data
+        if on_result:
+            on_result(i, data)
+
+    pending: List[Tuple[int, str, str]] = []
+    keys: Dict[int, str] = {}
+    for i, (name, resume_text, *rest) in enumerate(candidates):
+        block = builder.candidate_block(resume_text, rest[0] if rest else None)
+        keys[i] = feedback_cache_key(builder.prefix, block, model)
+        if use_cache:
+            cached = _cache_get(keys[i])
+            metrics.CACHE_REQUESTS.inc(cache="llm", result="miss" if cached is None else "hit")
+            if cached is not None:
+                finish(i, cached)
+                continue
+        pending.append((i, name, block))
+
+    async with httpx.AsyncClient(
+        base_url=base_url or OPENROUTER_BASE_URL,
+        headers={"Authorization": f"Bearer {api_key}"},
+        timeout=LLM_TIMEOUT,
+    ) as client:
+        async def run(batch: List[Tuple[int, str, str]]) -> None:
+            feedback, failed = await _feedback_batch(client, semaphore, builder, batch, model, max_retries)
+            for i, data in feedback.items():
+                if use_cache and i not in failed:
+                    _cache_put(keys[i], data)
+                finish(i, data)
+
+        await asyncio.gather(*(run(pending[b:b + batch_size]) for b in range(0, len(pending), batch_size)))
+    return results
+
+
+def generate_feedback(jd_text: str, candidates: List[Tuple], **kwargs) -> List[Dict[str, Any]]:
+    """Blocking wrapper for callers running outside an event loop (background jobs, pool workers)."""
+    if not candidates:
+        return []
+    return asyncio.run(generate_feedback_async(jd_text, candidates, **kwargs))
@@ -0,0 +1,310 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from utils import metrics
+from utils.paths import BASE_DIR
+
+JOBS_DB = BASE_DIR / "cache" / "jobs.db"
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "20"))
+# A running job's lease is renewed while its process is alive; once it lapses, any process
+# sharing the database puts the job back in the queue.
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+# How often idle workers look for jobs submitted by other processes.
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1"))
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINAL_STATES = {DONE, FAILED, CANCELLED}
+
+# Progress rows are rewritten at most this often per job, plus on every stage change.
+PROGRESS_WRITE_INTERVAL = 0.5
+# A running job re-reads its cancel flag from the database at most this often.
+CANCEL_CHECK_INTERVAL = 0.5
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once cancellation has been requested."""
+
+
+class JobContext:
+    """Handed to the runner so it can report progress and notice cancellation."""
+
+    def __init__(self, scheduler: "JobScheduler", job_id: str):
+        self._scheduler = scheduler
+        self.job_id = job_id
+        self._last_write = 0.0
+        self._last_stage: Optional[str] = None
+        self._last_cancel_check = 0.0
+        self._cancelled = False
+
+    @property
+    def cancelled(self) -> bool:
+        now = time.monotonic()
+        if not self._cancelled and now - self._last_cancel_check >= CANCEL_CHECK_INTERVAL:
+            self._last_cancel_check = now
+            self._cancelled = self._scheduler._cancel_requested(self.job_id)
+        return self._cancelled
+
+    def check_cancelled(self) -> None:
+        if self.cancelled:
+            raise JobCancelled(self.job_id)
+
+    def progress(self, stage: str, done: int, total: int) -> None:
+        now = time.monotonic()
+        if stage == self._last_stage and done < total and now - self._last_write < PROGRESS_WRITE_INTERVAL:
+            return
+        self._last_write, self._last_stage = now, stage
+        self._scheduler._update(self.job_id, stage=stage, done=done, total=total)
+
+
+Runner = Callable[[str, Dict[str, Any], JobContext], None]
+
+
+class JobScheduler:
+    """Bounded FIFO of analysis jobs served by a fixed pool of worker threads.
+
+    The SQLite jobs table is the queue, so several processes can share one database: a worker
+    claims the oldest queued row with a conditional UPDATE, records itself as the row's owner and
+    keeps its lease fresh while the job runs. Cancellation is a flag on the row. Rows whose lease
+    has lapsed (the owning process died) go back to the queue.
+    """
+
+    def __init__(self, runner: Runner, db_path: Path = JOBS_DB, workers: int = JOB_WORKERS,
+                 max_queue: int = JOB_QUEUE_SIZE):
+        self.runner = runner
+        self.db_path = Path(db_path)
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+        self._db_lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._db_lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    state TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    stage TEXT,
+                    done INTEGER DEFAULT 0,
+                    total INTEGER DEFAULT 0,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(state, created_at)")
+            # Columns added for multi-process claiming; older databases get them here.
+            cols = {r["name"] for r in self._conn.execute("PRAGMA table_info(jobs)")}
+            for name, decl in (("owner", "TEXT"), ("lease_until", "REAL"), ("cancel_requested", "INTEGER DEFAULT 0")):
+                if name not in cols:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {decl}")
+
+    def start(self) -> None:
+        with self._cond:
+            if self._threads:
+                return
+            self._stopping = False
+        self._recover()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        t = threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+        t.start()
+        self._threads.append(t)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def _recover(self) -> int:
+        """Requeues running jobs whose owner stopped renewing the lease; queued ones keep their place."""
+        with self._db_lock, self._conn:
+            cur = self._conn.execute(
+                "UPDATE jobs SET state=?, owner=NULL, lease_until=NULL, started_at=NULL "
+                "WHERE state=? AND (lease_until IS NULL OR lease_until<?)",
+                (QUEUED, RUNNING, time.time()),
+            )
+        if cur.rowcount:
+            print(f"[DEBUG] Requeued {cur.rowcount} interrupted job(s) in {self.db_path}")
+            with self._cond:
+                self._cond.notify_all()
+        return cur.rowcount
+
+    def _heartbeat(self) -> None:
+        # Renews the leases of this process's running jobs and requeues jobs of dead processes.
+        interval = max(JOB_LEASE_SECONDS / 3, 0.1)
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopping, timeout=interval)
+                if self._stopping:
+                    return
+            try:
+                with self._db_lock, self._conn:
+                    self._conn.execute("UPDATE jobs SET lease_until=? WHERE owner=? AND state=?",
+                                       (time.time() + JOB_LEASE_SECONDS, self.owner, RUNNING))
+                self._recover()
+            except sqlite3.Error as e:
+                print(f"[WARN] Job lease renewal failed: {e}")
+
+    def submit(self, job_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with self._db_lock, self._conn:
+            # BEGIN IMMEDIATE takes the write lock first, so the queue bound holds across processes.
+            self._conn.execute("BEGIN IMMEDIATE")
+            depth = self._conn.execute("SELECT COUNT(*) FROM jobs WHERE state=?", (QUEUED,)).fetchone()[0]
+            if depth >= self.max_queue:
+                raise QueueFull(f"{depth} jobs already queued")
+            self._conn.execute(
+                "INSERT INTO jobs (id, state, payload, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(payload, ensure_ascii=False), time.time()),
+            )
+        with self._cond:
+            self._cond.notify()
+        return {"job_id": job_id, "state": QUEUED, "queue_position": depth + 1}
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """Cancels a queued job immediately, or asks a running job to stop. Returns the resulting state."""
+        with self._db_lock, self._conn:
+            cur = self._conn.execute("UPDATE jobs SET state=?, finished_at=? WHERE id=? AND state=?",
+                                     (CANCELLED, time.time(), job_id, QUEUED))
+            if cur.rowcount:
+                return CANCELLED
+            cur = self._conn.execute("UPDATE jobs SET cancel_requested=1 WHERE id=? AND state=?", (job_id, RUNNING))
+            if cur.rowcount:
+                return RUNNING
+            row = self._conn.execute("SELECT state FROM jobs WHERE id=?", (job_id,)).fetchone()
+        return row["state"] if row else None
+
+    def _cancel_requested(self, job_id: str) -> bool:
+        with self._db_lock:
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE id=?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._db_lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id=?", (job_id,)).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def payload(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """The inputs a job was submitted with."""
+        with self._db_lock:
+            row = self._conn.execute("SELECT payload FROM jobs WHERE id=?", (job_id,)).fetchone()
+        return json.loads(row["payload"]) if row else None
+
+    def list(self, state: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        query, args = "SELECT * FROM jobs", []
+        if state:
+            query, args = query + " WHERE state=?", [state]
+        query += " ORDER BY created_at DESC LIMIT ?"
+        with self._db_lock:
+            rows = self._conn.execute(query, (*args, limit)).fetchall()
+        return [self._row_to_dict(r) for r in rows]
+
+    def queue_depth(self) -> int:
+        with self._db_lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE state=?", (QUEUED,)).fetchone()[0]
+
+    def _row_to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        for key in ("payload", "lease_until"):
+            job.pop(key, None)
+        job["cancel_requested"] = bool(job.get("cancel_requested"))
+        job["progress"] = round(job["done"] / job["total"], 4) if job["total"] else 0.0
+        if job["state"] == QUEUED:
+            with self._db_lock:
+                ahead = self._conn.execute("SELECT COUNT(*) FROM jobs WHERE state=? AND created_at<=?",
+                                           (QUEUED, job["created_at"])).fetchone()[0]
+            job["queue_position"] = ahead
+        return job
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        cols = ", ".join(f"{k}=?" for k in fields)
+        with self._db_lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {cols} WHERE id=?", (*fields.values(), job_id))
+
+    def _finish(self, job_id: str, **fields: Any) -> None:
+        # Only while this process still owns the row; if its lease lapsed, the rerun's outcome wins.
+        fields["finished_at"] = time.time()
+        cols = ", ".join(f"{k}=?" for k in fields)
+        with self._db_lock, self._conn:
+            cur = self._conn.execute(f"UPDATE jobs SET {cols} WHERE id=? AND owner=? AND state=?",
+                                     (*fields.values(), job_id, self.owner, RUNNING))
+        if not cur.rowcount:
+            print(f"[WARN] Job {job_id} was taken over by another worker; dropping this run's final state.")
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        """Takes the oldest queued job for this process, or None when the queue is empty.
+
+        The UPDATE only succeeds while the row is still queued, so when workers in several
+        processes race for the same job exactly one of them gets it.
+        """
+        while True:
+            with self._db_lock:
+                row = self._conn.execute("SELECT id, payload, created_at FROM jobs WHERE state=? "
+                                         "ORDER BY created_at LIMIT 1", (QUEUED,)).fetchone()
+                if row is None:
+                    return None
+                now = time.time()
+                with self._conn:
+                    cur = self._conn.execute(
+                        "UPDATE jobs SET state=?, owner=?, lease_until=?, started_at=? WHERE id=? AND state=?",
+                        (RUNNING, self.owner, now + JOB_LEASE_SECONDS, now, row["id"], QUEUED),
+                    )
+            if cur.rowcount == 1:
+                return row
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                if self._stopping:
+                    return
+            try:
+                row = self._claim()
+            except sqlite3.Error as e:
+                print(f"[WARN] Claiming a job failed: {e}")
+                row = None
+            if row is None:
+                # Woken early by submit() in this process; jobs from other processes are seen on the next poll.
+                with self._cond:
+                    if not self._stopping:
+                        self._cond.wait(JOB_POLL_SECONDS)
+                continue
+            job_id = row["id"]
+            started_at = time.time()
+            metrics.JOB_QUEUE_WAIT.observe(max(0.0, started_at - row["created_at"]))
+            ctx = JobContext(self, job_id)
+            state = DONE
+            try:
+                self.runner(job_id, json.loads(row["payload"]), ctx)
+            except JobCancelled:
+                state = CANCELLED
+                self._finish(job_id, state=CANCELLED)
+            except Exception as e:
+                state = FAILED
+                self._finish(job_id, state=FAILED, error=str(e))
+            else:
+                self._finish(job_id, state=DONE)
+            finally:
+                metrics.JOB_DURATION.observe(time.time() - started_at, state=state)
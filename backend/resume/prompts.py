@@ -0,0 +1,184 @@
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+from utils.section_parser import DATE_RANGE_RE, DEGREE_RE, parse_resume
+
+# Per-candidate and JD token budgets for feedback prompts. Resumes over budget keep their most
+# relevant sections and lines; the extracted facts (skills, education, experience) are always kept.
+LLM_RESUME_TOKEN_BUDGET = int(os.getenv("LLM_RESUME_TOKEN_BUDGET", "1000"))
+LLM_JD_TOKEN_BUDGET = int(os.getenv("LLM_JD_TOKEN_BUDGET", "1500"))
+
+# Bump when the prompt wording or layout changes so cached feedback is not reused across versions.
+PROMPT_VERSION = "2"
+
+SYSTEM_TEMPLATE = """You are an expert HR analyst. You compare candidates' resumes against one job description.
+
+For every candidate you are given, provide 3 strengths and 3 weaknesses relative to the job, and a brief overall feedback summary.
+Each candidate is given as <candidate id="..."> with the skills that match and are missing against the job, the education and experience extracted from the resume, and the relevant resume excerpts.
+ONLY respond with a valid JSON object in the following format, with no other text before or after it, and one entry per candidate using its id:
+{{
+  "candidates": [
+    {{
+      "id": "1",
+      "strengths": ["Strength 1", "Strength 2", "Strength 3"],
+      "weaknesses": ["Weakness 1", "Weakness 2", "Weakness 3"],
+      "feedback": "A short summary of the candidate's suitability."
+    }}
+  ]
+}}
+
+The job description is:
+---
+{jd_text}
+---"""
+
+# Structured-output schema matching SYSTEM_TEMPLATE, sent as response_format when enabled.
+FEEDBACK_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "candidate_feedback",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "candidates": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "string"},
+                            "strengths": {"type": "array", "items": {"type": "string"}},
+                            "weaknesses": {"type": "array", "items": {"type": "string"}},
+                            "feedback": {"type": "string"},
+                        },
+                        "required": ["id", "strengths", "weaknesses", "feedback"],
+                        "additionalProperties": False,
+                    },
+                }
+            },
+            "required": ["candidates"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+# Sections are kept in this order of preference when a resume is over budget.
+SECTION_PRIORITY = ("experience", "projects", "skills", "summary", "education", "certifications", "achievements")
+SECTION_TITLES = {"header": "Other", "experience": "Experience", "projects": "Projects", "skills": "Skills",
+                  "summary": "Summary", "education": "Education", "certifications": "Certifications",
+                  "achievements": "Achievements"}
+
+
+def count_tokens(text: str) -> int:
+    """Estimated token count (about four characters per token for English text).
+
+    Used for budgeting and reporting; the API's own counts are recorded from its usage field.
+    """
+    return (len(text or "") + 3) // 4
+
+
+def _truncate(text: str, tokens: int) -> str:
+    return text[:max(tokens, 0) * 4].rstrip()
+
+
+def compress_jd(jd_text: str, budget: int = LLM_JD_TOKEN_BUDGET) -> str:
+    """The JD's non-empty lines in order, cut off at the token budget."""
+    kept, used = [], 0
+    for line in (jd_text or "").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            kept.append(_truncate(line, budget - used))
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(l for l in kept if l)
+
+
+def compress_resume(
+    resume_text: str,
+    budget: int = LLM_RESUME_TOKEN_BUDGET,
+    skills_matched: Optional[Sequence[str]] = None,
+    skills_missing: Optional[Sequence[str]] = None,
+) -> str:
+    """A compact view of a resume that fits the token budget.
+
+    Starts with the matched and missing skills and the parsed education and experience, then adds
+    resume lines by section priority. Within a section, dated lines (role and degree headers) come
+    first, then lines by how many matched skills they mention. Kept lines are shown in their
+    original order under their section titles.
+    """
+    profile = parse_resume(resume_text or "")
+    facts = []
+    if skills_matched is not None:
+        facts.append("Matched skills: " + (", ".join(sorted(skills_matched)) or "none"))
+    if skills_missing is not None:
+        facts.append("Missing skills: " + (", ".join(sorted(skills_missing)) or "none"))
+    facts.append(f"Education: {profile['education']}")
+    facts.append(f"Experience: {profile['experience_years']} years")
+    header = "\n".join(facts)
+
+    remaining = budget - count_tokens(header) - 4
+    sections = profile["sections"]
+    order = [s for s in SECTION_PRIORITY if s in sections] + [s for s in sections if s not in SECTION_PRIORITY]
+    matched = [s.lower() for s in (skills_matched or [])]
+
+    # (section rank, -relevance, line index) -> greedy fill, so a tight budget drops the least useful lines.
+    ranked = []
+    for rank, section in enumerate(order):
+        for i, line in enumerate(sections[section]):
+            lower = line.lower()
+            relevance = sum(1 for s in matched if s in lower)
+            if DATE_RANGE_RE.search(line) or DEGREE_RE.search(line):
+                relevance += 100
+            ranked.append((rank, -relevance, i, section, line))
+    ranked.sort()
+    kept: Dict[str, Dict[int, str]] = {}
+    for _, _, i, section, line in ranked:
+        if remaining <= 0:
+            break
+        cost = count_tokens(line) + 1 + (0 if section in kept else 3)
+        if cost > remaining:
+            line = _truncate(line, remaining - (1 if section in kept else 4))
+            if not line:
+                break
+            cost = remaining
+        kept.setdefault(section, {})[i] = line
+        remaining -= cost
+
+    parts = [header, "Resume excerpt:"]
+    for section in sections:
+        if section in kept:
+            parts.append(f"## {SECTION_TITLES.get(section, section.title())}")
+            parts.extend(kept[section][i] for i in sorted(kept[section]))
+    return "\n".join(parts)
+
+
+class PromptBuilder:
+    """Feedback prompts for one JD: a shared system prefix plus token-budgeted candidate blocks.
+
+    The system message (instructions and JD) is identical for every request about the same JD,
+    so providers that cache prompt prefixes only process it once per job.
+    """
+
+    def __init__(self, jd_text: str, resume_budget: int = LLM_RESUME_TOKEN_BUDGET,
+                 jd_budget: int = LLM_JD_TOKEN_BUDGET):
+        self.resume_budget = resume_budget
+        self.prefix = SYSTEM_TEMPLATE.format(jd_text=compress_jd(jd_text, jd_budget))
+        self.prefix_tokens = count_tokens(self.prefix)
+
+    def candidate_block(self, resume_text: str, facts: Optional[Dict[str, Any]] = None) -> str:
+        facts = facts or {}
+        return compress_resume(resume_text, self.resume_budget,
+                               facts.get("skills_matched"), facts.get("skills_missing"))
+
+    def messages(self, ids: List[str], blocks: List[str]) -> List[Dict[str, str]]:
+        body = "\n\n".join(f'<candidate id="{cid}">\n{block}\n</candidate>' for cid, block in zip(ids, blocks))
+        return [{"role": "system", "content": self.prefix}, {"role": "user", "content": body}]
+
+    def token_report(self, messages: List[Dict[str, str]]) -> Dict[str, int]:
+        """Estimated prompt tokens of a request, split into the shared prefix and the candidates."""
+        candidates = sum(count_tokens(m["content"]) for m in messages if m["role"] != "system")
+        return {"prefix": self.prefix_tokens, "candidates": candidates, "total": self.prefix_tokens + candidates}
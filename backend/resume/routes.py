@@ -1,93 +1,511 @@
 import os
 from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, Form, BackgroundTasks, status
-from fastapi.responses import JSONResponse
-from typing import List
+from fastapi import APIRouter, UploadFile, File, Form, Header, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from typing import List, Optional
+import cProfile
 import json
 import shutil
+import threading
 import traceback
 from uuid import uuid4
-from .analysis import analyze_all_resumes
+from . import database, uploads
+from .batches import BatchStore
+from .analysis import AnalysisCancelled, analyze_all_resumes, analyze_batch, rescore_job, review_candidate
+from .events import JOB_EVENTS
+from .jobs import CANCELLED, DONE, FAILED, FINAL_STATES, QUEUED, RUNNING, JobCancelled, JobContext, JobScheduler, QueueFull
+from utils import metrics
+from utils.extractor import extract_text
+from utils.matcher import get_embedding
+from utils.paths import BASE_DIR
+from utils.vector_store import get_store
 
-# Detect Hugging Face environment
-RUNNING_IN_HF = "SPACE_ID" in os.environ
-
-if RUNNING_IN_HF:
-    BASE_DIR = Path("/tmp")  # Hugging Face can only write to /tmp
-else:
-    BASE_DIR = Path(__file__).resolve().parent.parent  # Local dev: backend/
-
-UPLOAD_DIR = BASE_DIR / "uploaded_cvs"
+UPLOAD_DIR = uploads.UPLOAD_DIR
 JD_DIR = BASE_DIR / "uploaded_jds"
 CACHE_DIR = BASE_DIR / "cache"
 RESULT_DIR = BASE_DIR / "results"
+PROFILE_DIR = BASE_DIR / "profiles"
+# "1" lets /resume/analyze/ take profile=true, writing a cProfile dump of that job's runner thread.
+JOB_PROFILING = os.getenv("JOB_PROFILING", "0") == "1"
+# "1" lets /resume/analyze/ without a batch_id fall back to the newest upload batch (any client's).
+ANALYZE_LATEST_BATCH_FALLBACK = os.getenv("ANALYZE_LATEST_BATCH_FALLBACK", "0") == "1"
 
 for d in [UPLOAD_DIR, JD_DIR, CACHE_DIR, RESULT_DIR]:
     d.mkdir(parents=True, exist_ok=True)
 
-RECENT_UPLOADS_FILE = CACHE_DIR / "recent_uploads.json"
-
 router = APIRouter()
 
+# Started and stopped (garbage collection) by the app lifespan in main.py.
+batch_store = BatchStore()
+
 
 @router.post("/upload-resumes/")
-async def upload_resumes(files: List[UploadFile] = File(...)):
+async def upload_resumes(files: List[UploadFile] = File(...), batch_id: Optional[str] = Form(None)):
+    """Stores resumes (PDF/DOCX, or ZIP archives of them) once per content hash.
+
+    Returns the batch_id to pass to /resume/analyze. Passing an existing batch_id adds to that batch.
+    """
     print("DEBUG: /resume/upload-resumes called with files:", [file.filename for file in files])
-    saved_files = []
+    if batch_id and not batch_store.exists(batch_id):
+        return JSONResponse(content={"error": "Unknown or expired batch."}, status_code=404)
+    stored, rejected = [], []
     for file in files:
-        file_path = UPLOAD_DIR / file.filename
-        with open(file_path, "wb") as buffer_file:
-            shutil.copyfileobj(file.file, buffer_file)
-        saved_files.append(file.filename)
-    RECENT_UPLOADS_FILE.write_text(json.dumps(saved_files, indent=2))
-    return {"status": "success", "files_uploaded": saved_files}
-
-def _run_analysis_background(job_id: str, jd_path: str, resume_paths: List[str], weights: dict):
-    print(f"--- [Background Job: {job_id}] Starting analysis. ---")
-    job_file = RESULT_DIR / f"results_{job_id}.json"
+        try:
+            if (file.filename or "").lower().endswith(".zip"):
+                added, skipped = await uploads.save_zip(file)
+                stored.extend(added)
+                rejected.extend(skipped)
+            else:
+                stored.append(await uploads.save_upload(file))
+        except uploads.UploadRejected as e:
+            rejected.append({"filename": file.filename, "error": str(e)})
+    # The same CV uploaded twice (under any name) is analyzed once.
+    unique = list({s["resume_id"]: s for s in stored}.values())
+    if not unique:
+        return JSONResponse(content={"error": "No resumes were stored.", "rejected": rejected}, status_code=400)
+    batch_id = batch_id or batch_store.create()
+    batch_store.add(batch_id, unique)
+    return {"status": "success", "batch_id": batch_id, "files_uploaded": [s["filename"] for s in unique], "files": stored,
+            "rejected": rejected}
+
+def _execute_job(job_id: str, payload: dict, on_event) -> None:
+    if payload.get("jd_paths"):
+        batch = analyze_batch(payload["jd_paths"], payload["weights"], payload["resume_paths"], on_event=on_event)
+        summary = _batch_summary(job_id, batch)
+        with metrics.STAGE_SECONDS.time(stage="persist"):
+            for jd in summary["jds"]:
+                database.save_job_results(jd["results_id"], batch["rankings"][jd["index"]])
+            database.save_job_summary(job_id, summary)
+        JOB_EVENTS.publish(job_id, "summary", summary)
+        print(f"--- [Job: {job_id}] Batch analysis complete. Results saved. ---")
+        return
+    results = analyze_all_resumes(payload["jd_path"], payload["weights"], payload["resume_paths"],
+                                  llm_top_k=payload.get("llm_top_k"), llm_min_score=payload.get("llm_min_score"),
+                                  on_event=on_event)
+    with metrics.STAGE_SECONDS.time(stage="persist"):
+        database.save_job_results(job_id, results)
+    JOB_EVENTS.publish(job_id, "summary", _ranking_summary(job_id, results))
+    print(f"--- [Job: {job_id}] Analysis complete. Results saved. ---")
+
+def _run_analysis_job(job_id: str, payload: dict, ctx: JobContext):
+    """Scheduler runner: one analysis job, publishing progress to the job row and the event stream."""
+    print(f"--- [Job: {job_id}] Starting analysis. ---")
+    JOB_EVENTS.open(job_id)  # no-op unless the job was recovered after a restart
+
+    def on_event(event: str, data: dict):
+        if ctx.cancelled:
+            raise AnalysisCancelled(job_id)
+        if event == "progress":
+            ctx.progress(data["stage"], data["done"], data["total"])
+        JOB_EVENTS.publish(job_id, event, data)
+
     try:
-        results = analyze_all_resumes(jd_path, weights, resume_paths)
-        job_file.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
-        print(f"--- [Background Job: {job_id}] Analysis complete. Results saved. ---")
+        # Inside the try, so a cancel that landed right after the claim still publishes and closes.
+        if ctx.cancelled:
+            raise AnalysisCancelled(job_id)
+        if payload.get("profile"):
+            profiler = cProfile.Profile()
+            try:
+                profiler.runcall(_execute_job, job_id, payload, on_event)
+            finally:
+                PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+                profiler.dump_stats(str(PROFILE_DIR / f"{job_id}.prof"))
+                print(f"[DEBUG] Wrote profile for job {job_id} to {PROFILE_DIR / f'{job_id}.prof'}")
+        else:
+            _execute_job(job_id, payload, on_event)
+    except AnalysisCancelled:
+        JOB_EVENTS.publish(job_id, "cancelled", {"job_id": job_id})
+        print(f"--- [Job: {job_id}] Analysis cancelled. ---")
+        raise JobCancelled(job_id)
     except Exception as e:
-        err = {"error": str(e), "trace": traceback.format_exc()}
-        job_file.write_text(json.dumps(err, indent=2, ensure_ascii=False), encoding="utf-8")
-        print(f"--- [Background Job: {job_id}] Analysis FAILED. Error: {e} ---")
+        traceback.print_exc()
+        JOB_EVENTS.publish(job_id, "error", {"error": str(e)})
+        print(f"--- [Job: {job_id}] Analysis FAILED. Error: {e} ---")
+        raise
+    finally:
+        JOB_EVENTS.close(job_id)
+
+# Started and stopped by the app lifespan in main.py.
+scheduler = JobScheduler(_run_analysis_job)
+metrics.Gauge("cvalign_job_queue_depth", "Analysis jobs waiting for a worker.", scheduler.queue_depth)
+
+def _ranking_summary(job_id: str, results: list) -> dict:
+    ranking = [
+        {"rank": i + 1, "name": r.get("name"), "resume_id": r.get("resume_id"), "score": r.get("score")}
+        for i, r in enumerate(x for x in results if "error" not in x)
+    ]
+    return {"job_id": job_id, "total": len(results), "errors": sum(1 for r in results if "error" in r),
+            "ranking": ranking}
+
+def _batch_summary(job_id: str, batch: dict) -> dict:
+    # Each JD's ranking is stored as its own result set {job_id}-{j}: /results pages it, /stream
+    # replays its ranking, and /rescore re-ranks it and updates column j and best_fit here.
+    jds = [{**jd, "index": j, "results_id": f"{job_id}-{j}"} for j, jd in enumerate(batch["jds"])]
+    return {"job_id": job_id, "jds": jds, "best_fit": batch["best_fit"], "candidates": batch["candidates"],
+            "score_matrix": batch["score_matrix"], "errors": batch["errors"]}
+
+# Rescoring two JDs of one batch at once must not lose either column update.
+_summary_lock = threading.Lock()
+
+def _rescore_batch_summary(results_id: str, weights: dict, ranking: list) -> None:
+    """After a batch JD's result set is rescored, updates its score-matrix column and the best-fit JDs."""
+    job_id, _, index = results_id.rpartition("-")
+    if not index.isdigit():
+        return
+    with _summary_lock:
+        summary = database.get_job_summary(job_id)
+        if summary is None or int(index) >= len(summary.get("jds", [])):
+            return
+        j = int(index)
+        scores = {r["resume_id"]: r["score"] for r in ranking}
+        summary["jds"][j]["weights"] = weights
+        for row, fit in zip(summary["score_matrix"], summary["best_fit"]):
+            row[j] = scores.get(fit["resume_id"], row[j])
+            best = max(range(len(row)), key=row.__getitem__)
+            fit.update(jd_index=best, jd=summary["jds"][best]["name"], score=row[best])
+        database.save_job_summary(job_id, summary)
+
+async def _save_jd(jd_file: UploadFile, job_id: str, index: Optional[int] = None):
+    """Stores a JD under uploaded_jds/<job_id>/ (one subfolder per JD for multi-JD jobs), or an error response.
+
+    Per-job paths keep queued jobs from reading a JD another client later uploaded under the same name.
+    """
+    target = JD_DIR / job_id if index is None else JD_DIR / job_id / str(index)
+    try:
+        return str(await uploads.save_document(jd_file, target))
+    except uploads.UploadRejected as e:
+        return JSONResponse(content={"error": f"Job description rejected: {e}"}, status_code=400)
+
+def _batch_resume_paths(batch_id: Optional[str]):
+    """The batch's resume paths, or an error response."""
+    if not batch_id:
+        if not ANALYZE_LATEST_BATCH_FALLBACK:
+            return JSONResponse(content={"error": "batch_id is required: pass the id returned by /resume/upload-resumes/."},
+                                status_code=400)
+        # Opt-in compatibility for clients from before upload batches: the newest batch, whoever uploaded it.
+        batch_id = batch_store.latest()
+        print(f"[WARN] /resume/analyze called without batch_id; using latest batch {batch_id}")
+        if batch_id is None:
+            return JSONResponse(content={"error": "Please upload resumes first."}, status_code=400)
+    resume_paths = batch_store.resume_paths(batch_id)
+    if resume_paths is None:
+        return JSONResponse(content={"error": "Unknown or expired batch. Please upload resumes again."},
+                            status_code=404)
+    if not resume_paths:
+        return JSONResponse(content={"error": "Please upload resumes first."}, status_code=400)
+    return resume_paths
 
 @router.post("/analyze/")
 async def analyze_endpoint(
-    background_tasks: BackgroundTasks,
     jd_file: UploadFile = File(...),
+    batch_id: Optional[str] = Form(None),
     education_weight: int = Form(20),
     experience_weight: int = Form(30),
     skills_weight: int = Form(50),
+    llm_top_k: Optional[int] = Form(None),
+    llm_min_score: Optional[float] = Form(None),
+    profile: bool = Form(False),
 ):
-    jd_path = JD_DIR / jd_file.filename
-    with open(jd_path, "wb") as f:
-        shutil.copyfileobj(jd_file.file, f)
+    if profile and not JOB_PROFILING:
+        return JSONResponse(content={"error": "Profiling is disabled on this server; set JOB_PROFILING=1 to enable it."},
+                            status_code=400)
     print(f"DEBUG: /resume/analyze called. JD file: {jd_file.filename}, weights: ",
           {"education": education_weight, "experience": experience_weight, "skills": skills_weight})
-    if not RECENT_UPLOADS_FILE.exists():
-        return JSONResponse(content={"error": "Please upload resumes first."}, status_code=400)
-
-    resume_names = json.loads(RECENT_UPLOADS_FILE.read_text())
-    resume_paths = [str(UPLOAD_DIR / name) for name in resume_names]
+    resume_paths = _batch_resume_paths(batch_id)
+    if isinstance(resume_paths, JSONResponse):
+        return resume_paths
     print("DEBUG: Resumes to analyze:", resume_paths)
     weights = {"skills": skills_weight, "education": education_weight, "experience": experience_weight}
 
     job_id = uuid4().hex
-    background_tasks.add_task(_run_analysis_background, job_id, str(jd_path), resume_paths, weights)
-    
-    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={"status": "started", "job_id": job_id})
+    jd_path = await _save_jd(jd_file, job_id)
+    if isinstance(jd_path, JSONResponse):
+        return jd_path
+    payload = {"jd_path": jd_path, "resume_paths": resume_paths, "weights": weights,
+               "llm_top_k": llm_top_k, "llm_min_score": llm_min_score, "profile": profile}
+    JOB_EVENTS.open(job_id)
+    try:
+        queued = scheduler.submit(job_id, payload)
+    except QueueFull:
+        JOB_EVENTS.close(job_id)
+        return JSONResponse(content={"error": "Too many analyses queued. Please retry shortly."},
+                            status_code=status.HTTP_429_TOO_MANY_REQUESTS, headers={"Retry-After": "30"})
+    JOB_EVENTS.publish(job_id, "progress", {"stage": "queued", "done": 0, "total": len(resume_paths)})
+
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={"status": "started", **queued})
+
+@router.post("/analyze-batch/")
+async def analyze_batch_endpoint(
+    jd_files: List[UploadFile] = File(...),
+    batch_id: Optional[str] = Form(None),
+    education_weight: int = Form(20),
+    experience_weight: int = Form(30),
+    skills_weight: int = Form(50),
+):
+    """Scores the uploaded resumes against several JDs in one job (no LLM feedback).
+
+    GET /resume/batch/{job_id} returns each candidate's best-fit JD and the score matrix; each JD's
+    ranking is paged through /resume/results/{job_id}-{jd_index}.
+    """
+    resume_paths = _batch_resume_paths(batch_id)
+    if isinstance(resume_paths, JSONResponse):
+        return resume_paths
+    weights = {"skills": skills_weight, "education": education_weight, "experience": experience_weight}
+    job_id = uuid4().hex
+    jd_paths = []
+    for j, jd_file in enumerate(jd_files):
+        jd_path = await _save_jd(jd_file, job_id, j)
+        if isinstance(jd_path, JSONResponse):
+            return jd_path
+        jd_paths.append(jd_path)
+    JOB_EVENTS.open(job_id)
+    try:
+        queued = scheduler.submit(job_id, {"jd_paths": jd_paths, "resume_paths": resume_paths, "weights": weights})
+    except QueueFull:
+        JOB_EVENTS.close(job_id)
+        return JSONResponse(content={"error": "Too many analyses queued. Please retry shortly."},
+                            status_code=status.HTTP_429_TOO_MANY_REQUESTS, headers={"Retry-After": "30"})
+    JOB_EVENTS.publish(job_id, "progress", {"stage": "queued", "done": 0, "total": len(resume_paths)})
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={"status": "started", **queued})
+
+@router.get("/batch/{job_id}")
+def get_batch(job_id: str, top: int = 10):
+    """A batch job's summary, with the top candidates of each JD's ranking inlined."""
+    summary = database.get_job_summary(job_id)
+    if summary is None:
+        job = scheduler.get(job_id)
+        if job is None:
+            return JSONResponse(content={"error": "Unknown job."}, status_code=404)
+        if job["state"] in (CANCELLED, FAILED):
+            return JSONResponse(content={"status": job["state"], "error": job["error"]})
+        return JSONResponse(content={"status": "pending", "state": job["state"], "progress": job["progress"]},
+                            status_code=status.HTTP_202_ACCEPTED)
+    for jd in summary["jds"]:
+        jd["total"], jd["top"] = database.query_results(jd["results_id"], limit=max(1, min(top, database.MAX_PAGE_SIZE)))
+    return summary
+
+@router.get("/batches/{batch_id}")
+def get_batch_files(batch_id: str):
+    batch = batch_store.get(batch_id)
+    if batch is None:
+        return JSONResponse(content={"error": "Unknown or expired batch."}, status_code=404)
+    return batch
+
+@router.delete("/batches/{batch_id}")
+def delete_batch(batch_id: str):
+    """Forgets a batch now; its files are removed by the next GC run unless another batch uses them."""
+    if not batch_store.delete(batch_id):
+        return JSONResponse(content={"error": "Unknown or expired batch."}, status_code=404)
+    return {"status": "deleted", "batch_id": batch_id}
+
+@router.get("/jobs")
+def list_jobs(state: Optional[str] = None, limit: int = 50):
+    return {"queue_depth": scheduler.queue_depth(), "jobs": scheduler.list(state=state, limit=max(1, min(limit, 500)))}
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = scheduler.get(job_id)
+    if job is None:
+        return JSONResponse(content={"error": "Unknown job."}, status_code=404)
+    return job
+
+@router.get("/jobs/{job_id}/profile")
+def get_job_profile(job_id: str):
+    """The cProfile dump of a job submitted with profile=true (open with pstats or snakeviz)."""
+    path = PROFILE_DIR / f"{Path(job_id).name}.prof"
+    if not path.exists():
+        return JSONResponse(content={"error": "No profile for this job."}, status_code=404)
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
+
+@router.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    state = scheduler.cancel(job_id)
+    if state is None:
+        return JSONResponse(content={"error": "Unknown job."}, status_code=404)
+    if state == CANCELLED and JOB_EVENTS.known(job_id):
+        JOB_EVENTS.publish(job_id, "cancelled", {"job_id": job_id})
+        JOB_EVENTS.close(job_id)
+    # A running job stops at its next progress point; poll /jobs/{job_id} for the final state.
+    return {"job_id": job_id, "state": state, "cancel_requested": state == RUNNING}
 
 @router.get("/results/{job_id}")
-async def get_results(job_id: str):
+async def get_results(
+    job_id: str,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    sort: str = "score",
+    order: str = "desc",
+    min_score: Optional[float] = None,
+    skill: Optional[str] = None,
+):
+    """A finished job's candidates, ranked by score by default.
+
+    Without `limit` the whole (filtered) list is returned as before; with it, one page
+    wrapped as {total, offset, limit, results}. `skill` keeps candidates whose matched
+    skills include it; `sort` is one of database.SORTABLE_COLUMNS.
+    """
     print(f"DEBUG: /resume/results called for job_id: {job_id}")
-    p = RESULT_DIR / f"results_{job_id}.json"
-    if not p.exists():
-        return JSONResponse(content={"status": "pending"}, status_code=status.HTTP_202_ACCEPTED)
+    if not await run_in_threadpool(database.has_results, job_id):
+        job = scheduler.get(job_id)
+        if job is None:
+            return JSONResponse(content={"error": "Unknown job."}, status_code=404)
+        if job["state"] in (CANCELLED, FAILED):
+            return JSONResponse(content={"status": job["state"], "error": job["error"]})
+        if job["state"] == DONE:
+            return JSONResponse(content=[])
+        return JSONResponse(content={"status": "pending", "state": job["state"], "progress": job["progress"]},
+                            status_code=status.HTTP_202_ACCEPTED)
+    if sort not in database.SORTABLE_COLUMNS:
+        return JSONResponse(content={"error": f"sort must be one of {sorted(database.SORTABLE_COLUMNS)}"},
+                            status_code=400)
+    total, page = await run_in_threadpool(database.query_results, job_id, offset=offset, limit=limit, sort=sort,
+                                          order=order, min_score=min_score, skill=skill)
+    headers = {"X-Total-Count": str(total)}
+    if limit is None:
+        return JSONResponse(content=page, headers=headers)
+    limit = max(1, min(limit, database.MAX_PAGE_SIZE))
+    return JSONResponse(content={"total": total, "offset": max(0, offset), "limit": limit, "results": page},
+                        headers=headers)
+
+@router.post("/rescore/{job_id}")
+def rescore_results(
+    job_id: str,
+    education_weight: int = Form(20),
+    experience_weight: int = Form(30),
+    skills_weight: int = Form(50),
+):
+    """Re-ranks a finished job with new weights, without re-running extraction, embedding or the LLM.
+
+    For a multi-JD job, each JD's result set {job_id}-{jd_index} is rescored on its own; its column
+    of the batch score matrix and the best-fit JDs are updated to match.
+    """
+    if not database.has_results(job_id):
+        summary = database.get_job_summary(job_id)
+        if summary is not None and summary.get("jds"):
+            return JSONResponse(content={"error": f"Multi-JD job: rescore each JD at /resume/rescore/{job_id}-<jd_index>."},
+                                status_code=400)
+        job = scheduler.get(job_id)
+        if job is None:
+            return JSONResponse(content={"error": "Unknown job."}, status_code=404)
+        return JSONResponse(content={"error": f"Job is {job['state']}; nothing to rescore yet."}, status_code=409)
+    weights = {"skills": skills_weight, "education": education_weight, "experience": experience_weight}
+    ranking = rescore_job(job_id, weights)
+    _rescore_batch_summary(job_id, weights, ranking)
+    return {"job_id": job_id, "weights": weights, "total": len(ranking), "ranking": ranking}
+
+STREAM_KEEPALIVE_SECONDS = 15.0
+# While no events arrive, a stream re-reads the job row this often: a job claimed by another
+# server process publishes its events there, so this process only learns of the end from the DB.
+STREAM_STATE_CHECK_SECONDS = 2.0
+
+def _format_event(evt: dict, fmt: str) -> str:
+    if fmt == "ndjson":
+        return json.dumps({"id": evt["id"], "event": evt["event"], "data": evt["data"]}, ensure_ascii=False) + "\n"
+    return f"id: {evt['id']}\nevent: {evt['event']}\ndata: {json.dumps(evt['data'], ensure_ascii=False)}\n\n"
+
+def _final_event(job_id: str, job: Optional[dict], event_id: int) -> dict:
+    """The event ending a stream whose live events are not in this process: the saved ranking, or the end state."""
+    if job is None or job["state"] == DONE:
+        summary = database.get_job_summary(job_id)
+        if summary is None:
+            summary = _ranking_summary(job_id, database.query_results(job_id)[1])
+        return {"id": event_id, "event": "summary", "data": summary}
+    return {"id": event_id, "event": "error" if job["state"] == FAILED else job["state"],
+            "data": {"job_id": job_id, "error": job["error"]}}
+
+@router.get("/stream/{job_id}")
+async def stream_results(job_id: str, format: str = "sse", last_event_id: Optional[str] = Header(None)):
+    """Streams a job's progress, per-candidate results, feedback and final ranking as they happen.
+
+    format=sse (default) emits Server-Sent Events; format=ndjson emits one JSON object per line.
+    """
+    fmt = "ndjson" if format == "ndjson" else "sse"
+    job = scheduler.get(job_id)
+    if job is not None and job["state"] in (QUEUED, RUNNING):
+        JOB_EVENTS.open(job_id)
+    if not JOB_EVENTS.known(job_id):
+        # A multi-JD job's per-JD result set ({job_id}-{jd_index}) has no job row of its own.
+        if job is None and not database.has_results(job_id):
+            return JSONResponse(content={"error": "Unknown job."}, status_code=404)
+        # The job finished before this process could record its events: replay the saved ranking.
+        media = "application/x-ndjson" if fmt == "ndjson" else "text/event-stream"
+        return StreamingResponse(iter([_format_event(_final_event(job_id, job, 0), fmt)]), media_type=media)
+
+    cursor = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+
+    async def event_source():
+        nonlocal cursor
+        idle = 0.0
+        while True:
+            events, closed = await JOB_EVENTS.wait(job_id, cursor, STREAM_STATE_CHECK_SECONDS)
+            for evt in events:
+                yield _format_event(evt, fmt)
+            cursor += len(events)
+            if closed and not events:
+                break
+            if events:
+                idle = 0.0
+                continue
+            # Nothing published here: the job may be running in another process sharing jobs.db.
+            # Logs of jobs run in this process are closed before their row reaches a final state.
+            current = await run_in_threadpool(scheduler.get, job_id)
+            if current is None or current["state"] in FINAL_STATES:
+                final = await run_in_threadpool(_final_event, job_id, current, cursor)
+                yield _format_event(final, fmt)
+                JOB_EVENTS.close(job_id)  # so the empty local log is pruned
+                break
+            idle += STREAM_STATE_CHECK_SECONDS
+            if idle >= STREAM_KEEPALIVE_SECONDS and fmt == "sse":
+                idle = 0.0
+                yield ": keep-alive\n\n"
+
+    media = "application/x-ndjson" if fmt == "ndjson" else "text/event-stream"
+    return StreamingResponse(event_source(), media_type=media,
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.post("/feedback/{job_id}/{resume_id}")
+def request_feedback(job_id: str, resume_id: str):
+    """LLM feedback for a candidate that was left unreviewed by llm_top_k / llm_min_score."""
+    payload = scheduler.payload(job_id)
+    entry = database.get_result(job_id, resume_id) if payload else None
+    if entry is None:
+        return JSONResponse(content={"error": "Job or candidate not found, or job still running."}, status_code=404)
+    if entry.get("reviewed"):
+        return entry
+    # Stored resumes live at uploaded_cvs/<resume_id>/<name>; names alone can repeat across CVs.
+    resume_path = next((p for p in payload["resume_paths"] if Path(p).parent.name == resume_id), None)
+    if resume_path is None or not Path(resume_path).exists():
+        return JSONResponse(content={"error": "Resume file is no longer available."}, status_code=410)
+    review_candidate(payload["jd_path"], resume_path, entry)
+    database.update_result(job_id, resume_id, entry)
+    return entry
+
+def _search_index(jd_path: str, k: int):
     try:
-        data = json.loads(p.read_text(encoding="utf-8"))
-    except Exception:
-        data = {"error": "Could not read results file"}
-    return JSONResponse(content=data)
\ No newline at end of file
+        jd_text = extract_text(jd_path, use_cache=False)
+    except Exception as e:
+        return JSONResponse(content={"error": f"Could not extract text: {e}"}, status_code=400)
+    jd_vec = get_embedding(jd_text)
+    if jd_vec is None:
+        return JSONResponse(content={"error": "Job description is empty."}, status_code=400)
+    store = get_store()
+    return {"total_indexed": len(store), "results": store.search(jd_vec, k=max(1, min(k, 1000)))}
+
+@router.post("/search")
+async def search_resumes(jd_file: UploadFile = File(...), k: int = Form(10)):
+    """Top-k stored resumes for a JD, from the persistent embedding index."""
+    search_id = f"search-{uuid4().hex}"
+    jd_path = await _save_jd(jd_file, search_id)
+    if isinstance(jd_path, JSONResponse):
+        return jd_path
+    try:
+        return await run_in_threadpool(_search_index, jd_path, k)
+    finally:
+        shutil.rmtree(JD_DIR / search_id, ignore_errors=True)
+
+@router.delete("/index/{resume_id}")
+def delete_indexed_resume(resume_id: str):
+    if not get_store().delete(resume_id):
+        return JSONResponse(content={"error": "Resume not found in index."}, status_code=404)
+    return {"status": "deleted", "resume_id": resume_id}
@@ -0,0 +1,181 @@
+import hashlib
+import os
+import threading
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from uuid import uuid4
+
+import aiofiles
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from utils.paths import BASE_DIR
+
+# Resumes are stored once per content hash: uploaded_cvs/<sha256>/<first uploaded filename>.
+UPLOAD_DIR = BASE_DIR / "uploaded_cvs"
+INCOMING_DIR = UPLOAD_DIR / ".incoming"
+
+UPLOAD_CHUNK = 1024 * 1024
+UPLOAD_MAX_BYTES = int(float(os.getenv("UPLOAD_MAX_MB", "10")) * 1024 * 1024)
+ZIP_MAX_BYTES = int(float(os.getenv("ZIP_MAX_MB", "200")) * 1024 * 1024)
+ZIP_MAX_FILES = int(os.getenv("ZIP_MAX_FILES", "2000"))
+# Total decompressed size of one archive's resumes.
+ZIP_MAX_EXPANDED_BYTES = int(float(os.getenv("ZIP_MAX_EXPANDED_MB", "500")) * 1024 * 1024)
+ALLOWED_SUFFIXES = (".pdf", ".docx")
+
+_commit_lock = threading.Lock()
+
+
+class UploadRejected(ValueError):
+    pass
+
+
+class _ArchiveTooLarge(Exception):
+    pass
+
+
+def _safe_name(filename: str) -> str:
+    # Drops any directory part (including "../" in archive members) and keeps just the file name.
+    name = Path((filename or "").replace("\\", "/")).name
+    if not name or name.startswith("."):
+        raise UploadRejected(f"Invalid file name {filename!r}.")
+    return name
+
+
+def _check_suffix(name: str) -> None:
+    if Path(name).suffix.lower() not in ALLOWED_SUFFIXES:
+        raise UploadRejected(f"{name}: only PDF and DOCX files are accepted.")
+
+
+def _incoming_path() -> Path:
+    INCOMING_DIR.mkdir(parents=True, exist_ok=True)
+    return INCOMING_DIR / f"{uuid4().hex}.part"
+
+
+def _commit(tmp: Path, digest: str, name: str, size: int) -> Dict[str, Any]:
+    """Moves a fully written upload into place, or drops it if the same content is already stored."""
+    target_dir = UPLOAD_DIR / digest
+    with _commit_lock:
+        existing = next((p for p in target_dir.iterdir() if p.is_file()), None) if target_dir.is_dir() else None
+        if existing is not None:
+            tmp.unlink(missing_ok=True)
+            os.utime(target_dir)  # a fresh upload of old content restarts the batch GC grace period
+            target, duplicate = existing, True
+        else:
+            target_dir.mkdir(parents=True, exist_ok=True)
+            target, duplicate = target_dir / name, False
+            os.replace(tmp, target)
+    return {"filename": target.name, "uploaded_as": name, "resume_id": digest, "size": size,
+            "path": f"{digest}/{target.name}", "duplicate": duplicate}
+
+
+async def _write_chunks(file: UploadFile, tmp: Path, max_bytes: int) -> Tuple[str, int]:
+    h, size = hashlib.sha256(), 0
+    async with aiofiles.open(tmp, "wb") as out:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadRejected(f"{file.filename}: larger than {max_bytes // 2**20} MB.")
+            h.update(chunk)
+            await out.write(chunk)
+    return h.hexdigest(), size
+
+
+async def save_upload(file: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES) -> Dict[str, Any]:
+    """Streams one resume to disk in chunks, hashing as it goes, and stores it under its content hash."""
+    name = _safe_name(file.filename)
+    _check_suffix(name)
+    tmp = _incoming_path()
+    try:
+        digest, size = await _write_chunks(file, tmp, max_bytes)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return _commit(tmp, digest, name, size)
+
+
+async def save_document(file: UploadFile, target_dir: Path, max_bytes: int = UPLOAD_MAX_BYTES) -> Path:
+    """Streams one PDF/DOCX (e.g. a JD) to target_dir under its sanitized name and returns its path."""
+    name = _safe_name(file.filename)
+    _check_suffix(name)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    tmp = _incoming_path()
+    try:
+        await _write_chunks(file, tmp, max_bytes)
+        os.replace(tmp, target_dir / name)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return target_dir / name
+
+
+def ingest_zip(zip_path: Path, max_bytes: int = UPLOAD_MAX_BYTES) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Stores each PDF/DOCX in an archive, decompressing member by member in chunks.
+
+    Returns (stored, skipped). Member sizes and the archive's total decompressed size are enforced
+    while reading, not from the archive's declared sizes, so a crafted archive can't expand past the
+    limits. Going over ZIP_MAX_EXPANDED_BYTES rejects the whole archive with UploadRejected; members
+    already stored are unreferenced and removed by the batch GC.
+    """
+    stored: List[Dict[str, Any]] = []
+    skipped: List[Dict[str, Any]] = []
+    expanded = 0
+    too_large = UploadRejected(f"archive expands to more than {ZIP_MAX_EXPANDED_BYTES // 2**20} MB.")
+    with zipfile.ZipFile(zip_path) as zf:
+        declared = sum(m.file_size for m in zf.infolist() if Path(m.filename).suffix.lower() in ALLOWED_SUFFIXES)
+        if declared > ZIP_MAX_EXPANDED_BYTES:
+            raise too_large
+        for member in zf.infolist():
+            if member.is_dir() or "__MACOSX" in member.filename:
+                continue
+            try:
+                name = _safe_name(member.filename)
+                _check_suffix(name)
+                if len(stored) >= ZIP_MAX_FILES:
+                    raise UploadRejected(f"{name}: archive has more than {ZIP_MAX_FILES} resumes.")
+                if member.file_size > max_bytes:
+                    raise UploadRejected(f"{name}: larger than {max_bytes // 2**20} MB.")
+            except UploadRejected as e:
+                skipped.append({"filename": member.filename, "error": str(e)})
+                continue
+            tmp = _incoming_path()
+            h, size = hashlib.sha256(), 0
+            try:
+                with zf.open(member) as src, open(tmp, "wb") as out:
+                    for chunk in iter(lambda: src.read(UPLOAD_CHUNK), b""):
+                        size += len(chunk)
+                        expanded += len(chunk)
+                        if expanded > ZIP_MAX_EXPANDED_BYTES:
+                            raise _ArchiveTooLarge()
+                        if size > max_bytes:
+                            raise UploadRejected(f"{name}: larger than {max_bytes // 2**20} MB.")
+                        h.update(chunk)
+                        out.write(chunk)
+            except _ArchiveTooLarge:
+                tmp.unlink(missing_ok=True)
+                raise too_large
+            except (UploadRejected, zipfile.BadZipFile, OSError) as e:
+                tmp.unlink(missing_ok=True)
+                skipped.append({"filename": member.filename, "error": str(e)})
+                continue
+            stored.append(_commit(tmp, h.hexdigest(), name, size))
+    return stored, skipped
+
+
+async def save_zip(file: UploadFile) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Spools an uploaded archive to disk in chunks, then extracts it off the event loop."""
+    tmp = _incoming_path()
+    try:
+        await _write_chunks(file, tmp, ZIP_MAX_BYTES)
+        try:
+            return await run_in_threadpool(ingest_zip, tmp)
+        except zipfile.BadZipFile as e:
+            raise UploadRejected(f"{file.filename}: not a valid ZIP archive ({e}).")
+        except UploadRejected as e:
+            raise UploadRejected(f"{file.filename}: {e}")
+    finally:
+        tmp.unlink(missing_ok=True)
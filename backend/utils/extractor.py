@@ -1,24 +1,104 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
 import pdfplumber
 import docx
 import os
+from pypdf import PdfReader
+from . import text_cache
+from .pools import pool_context
 
-def extract_text_from_pdf(file_path):
-    text = ""
+# Bump whenever extraction output changes so stale cache entries are not reused.
+EXTRACTOR_VERSION = "2"
+
+# "fast" reads the text layer with pypdf (no layout analysis) and falls back to pdfplumber when that
+# yields too little text; "pdfplumber" always uses the layout-analysing extractor.
+PDF_ENGINE = os.getenv("PDF_ENGINE", "fast")
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "30"))
+PDF_MAX_MB = float(os.getenv("PDF_MAX_MB", "20"))
+# Documents with at least this many (capped) pages are split across a process pool, page range per worker.
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "12"))
+PDF_PAGE_WORKERS = int(os.getenv("PDF_PAGE_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+# Fewer characters than this per page from the fast path means it likely missed the text.
+PDF_MIN_CHARS_PER_PAGE = 40
+
+_page_pool = None
+_page_pool_lock = threading.Lock()
+# Forkserver workers (see utils/pools.py) start with this module and pypdf already imported.
+_PAGE_POOL_CONTEXT = pool_context(preload=[__name__])
+
+def _get_page_pool():
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            _page_pool = ProcessPoolExecutor(max_workers=PDF_PAGE_WORKERS, mp_context=_PAGE_POOL_CONTEXT)
+        return _page_pool
+
+def _pypdf_page_range(file_path, start, stop):
+    reader = PdfReader(file_path)
+    return "\n".join(reader.pages[i].extract_text() or "" for i in range(start, stop))
+
+def _extract_pdf_fast(file_path, max_pages):
+    """Text layer of the first max_pages pages via pypdf. Returns (text, pages read)."""
+    reader = PdfReader(file_path)
+    n = min(len(reader.pages), max_pages)
+    # Pool workers (process-mode analysis) already run one document per core; don't nest pools there.
+    if n >= PDF_PARALLEL_MIN_PAGES and PDF_PAGE_WORKERS > 1 and multiprocessing.parent_process() is None:
+        step = -(-n // PDF_PAGE_WORKERS)
+        starts = list(range(0, n, step))
+        stops = [min(s + step, n) for s in starts]
+        chunks = list(_get_page_pool().map(_pypdf_page_range, [file_path] * len(starts), starts, stops))
+    else:
+        chunks = [reader.pages[i].extract_text() or "" for i in range(n)]
+    return "\n".join(chunks).strip(), n
+
+def _extract_pdf_pdfplumber(file_path, max_pages):
     with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            text += page.extract_text() or ""
-    return text.strip()
+        return "\n".join(page.extract_text() or "" for page in pdf.pages[:max_pages]).strip()
+
+def extract_text_from_pdf(file_path, engine=None, max_pages=None):
+    size_mb = os.path.getsize(file_path) / 2**20
+    if size_mb > PDF_MAX_MB:
+        raise ValueError(f"PDF is {size_mb:.1f} MB; the limit is {PDF_MAX_MB:g} MB.")
+    engine = engine or PDF_ENGINE
+    max_pages = max_pages or PDF_MAX_PAGES
+    if engine == "fast":
+        try:
+            text, pages = _extract_pdf_fast(file_path, max_pages)
+            if len(text) >= PDF_MIN_CHARS_PER_PAGE * pages:
+                return text
+            print(f"[WARN] Fast PDF extraction found little text in {file_path}; falling back to pdfplumber")
+        except Exception as e:
+            print(f"[WARN] Fast PDF extraction failed for {file_path} ({e}); falling back to pdfplumber")
+    return _extract_pdf_pdfplumber(file_path, max_pages)
 
 def extract_text_from_docx(file_path):
     doc = docx.Document(file_path)
     text = "\n".join([para.text for para in doc.paragraphs])
     return text.strip()
 
-def extract_text(file_path):
-    ext = os.path.splitext(file_path)[1].lower()
+def _extract_uncached(file_path, ext):
     if ext == ".pdf":
         return extract_text_from_pdf(file_path)
     elif ext == ".docx":
         return extract_text_from_docx(file_path)
-    else:
+
+def extract_text_with_hit(file_path, use_cache=True, digest=None):
+    """Like extract_text, also returning whether this call was served from the text cache."""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext not in (".pdf", ".docx"):
         raise ValueError("Unsupported file format. Only PDF and DOCX allowed.")
+    if not use_cache:
+        return _extract_uncached(file_path, ext), False
+    digest = digest or text_cache.file_digest(file_path)
+    version = f"{EXTRACTOR_VERSION}-{PDF_ENGINE}-{PDF_MAX_PAGES}{ext}" if ext == ".pdf" else f"{EXTRACTOR_VERSION}{ext}"
+    key = text_cache.cache_key(digest, version)
+    cached = text_cache.get(key)
+    if cached is not None:
+        return cached, True
+    text = _extract_uncached(file_path, ext)
+    text_cache.put(key, text)
+    return text, False
+
+def extract_text(file_path, use_cache=True, digest=None):
+    return extract_text_with_hit(file_path, use_cache, digest)[0]
@@ -1,17 +1,76 @@
-import spacy
-from sklearn.metrics.pairwise import cosine_similarity
+import numpy as np
 from .extractor import extract_text
 import os
+import threading
 
-# load a spaCy model (use a small English model for speed)
-nlp = spacy.load("en_core_web_md")  # or en_core_web_sm if resources limited
+# en_core_web_sm is lighter but has no static word vectors, so doc similarity degrades badly.
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_md")
+# Doc vectors are averages of the static word vectors, so the tokenizer and vector table are all we
+# need; excluding the trained components skips loading their weights at all.
+SPACY_EXCLUDE = ["tok2vec", "tagger", "morphologizer", "parser", "senter", "attribute_ruler", "lemmatizer", "ner"]
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+
+_nlp = None
+_nlp_lock = threading.Lock()
+
+def get_nlp():
+    """The spaCy pipeline, loaded on first use (or by warm_up at startup)."""
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                import spacy  # importing spacy alone takes about a second; defer it with the model
+                _nlp = spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+                print(f"[DEBUG] Loaded spaCy model {SPACY_MODEL} with pipes {_nlp.pipe_names}")
+    return _nlp
+
+def warm_up():
+    """Loads the model and runs one tiny doc through it so the first request doesn't pay for it."""
+    get_nlp()("warm up").vector
 
 def get_embedding(text):
     if not text:
         return None
-    doc = nlp(text)
+    doc = get_nlp()(text)
     return doc.vector.reshape(1, -1)
 
+def embed_texts(texts, batch_size=EMBED_BATCH_SIZE):
+    """Embeds many texts in one nlp.pipe pass. Returns an (n, dim) float32 matrix; empty texts get zero rows."""
+    nlp = get_nlp()
+    out = np.zeros((len(texts), nlp.vocab.vectors_length), dtype=np.float32)
+    idx = [i for i, t in enumerate(texts) if t]
+    docs = nlp.pipe((texts[i] for i in idx), batch_size=batch_size)
+    for i, doc in zip(idx, docs):
+        out[i] = doc.vector
+    return out
+
+def cosine_scores(query, matrix):
+    """Cosine similarity of one vector against every row of matrix; zero vectors score 0."""
+    query = np.asarray(query, dtype=np.float32).ravel()
+    matrix = np.asarray(matrix, dtype=np.float32)
+    q_norm = np.linalg.norm(query)
+    row_norms = np.linalg.norm(matrix, axis=1)
+    denom = row_norms * q_norm
+    dots = matrix @ query
+    return np.divide(dots, denom, out=np.zeros_like(dots), where=denom > 0)
+
+def cosine_matrix(a, b):
+    """Pairwise cosine similarity between the rows of a (m, dim) and b (n, dim); zero rows score 0."""
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    a_norms = np.linalg.norm(a, axis=1, keepdims=True)
+    b_norms = np.linalg.norm(b, axis=1, keepdims=True)
+    a = np.divide(a, a_norms, out=np.zeros_like(a), where=a_norms > 0)
+    b = np.divide(b, b_norms, out=np.zeros_like(b), where=b_norms > 0)
+    return a @ b.T
+
+def batch_similarity(jd_text, texts):
+    """Similarity of the JD to each text, embedding the JD once and the texts as one batch."""
+    if not jd_text or not texts:
+        return np.zeros(len(texts), dtype=np.float32)
+    jd_vec = embed_texts([jd_text])[0]
+    return cosine_scores(jd_vec, embed_texts(texts))
+
 def compute_similarity(text1, text2):
     if not text1 or not text2:
         return 0.0
@@ -19,29 +78,61 @@ def compute_similarity(text1, text2):
     emb2 = get_embedding(text2)
     if emb1 is None or emb2 is None:
         return 0.0
-    similarity = cosine_similarity(emb1, emb2).item()
+    similarity = cosine_scores(emb1, emb2).item()
     return similarity
 
 
+def match_all_cvs_to_jds(jd_paths, cv_folder):
+    """match_all_cvs_to_jd for several JDs, embedding every CV and JD once. Returns {jd_path: ranking}."""
+    jd_texts = [extract_text(p) for p in jd_paths]
+
+    texts, names, errors = [], [], []
+    for filename in os.listdir(cv_folder):
+        file_path = os.path.join(cv_folder, filename)
+        if not os.path.isfile(file_path):
+            continue
+        try:
+            texts.append(extract_text(file_path))
+            names.append(filename)
+        except Exception as e:
+            errors.append({"filename": filename, "error": str(e)})
+
+    if texts:
+        scores = cosine_matrix(embed_texts(texts), embed_texts(jd_texts))
+    else:
+        scores = np.zeros((0, len(jd_paths)), dtype=np.float32)
+    rankings = {}
+    for j, jd_path in enumerate(jd_paths):
+        results = list(errors)
+        for filename, score in zip(names, scores[:, j]):
+            results.append({"filename": filename, "match_score": round(float(score) * 100, 2)})
+        rankings[jd_path] = sorted(results, key=lambda x: x.get("match_score", 0), reverse=True)
+    return rankings
+
+
 def match_all_cvs_to_jd(jd_path, cv_folder):
     results = []
     jd_text = extract_text(jd_path)
 
+    texts, names = [], []
     for filename in os.listdir(cv_folder):
         file_path = os.path.join(cv_folder, filename)
         if not os.path.isfile(file_path):
             continue
         try:
-            cv_text = extract_text(file_path)
-            score = compute_similarity(jd_text, cv_text)
-            results.append({
-                "filename": filename,
-                "match_score": round(score * 100, 2)
-            })
+            texts.append(extract_text(file_path))
+            names.append(filename)
         except Exception as e:
             results.append({
                 "filename": filename,
                 "error": str(e)
             })
 
-    return sorted(results, key=lambda x: x["match_score"], reverse=True)
+    scores = batch_similarity(jd_text, texts)
+    for filename, score in zip(names, scores):
+        results.append({
+            "filename": filename,
+            "match_score": round(float(score) * 100, 2)
+        })
+
+    return sorted(results, key=lambda x: x.get("match_score", 0), reverse=True)
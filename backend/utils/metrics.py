@@ -0,0 +1,151 @@
+"""In-process counters and histograms rendered in the Prometheus text exposition format.
+
+Kept dependency-free: pool workers report their timings back with each result and the parent
+process records them, so one registry per API process is enough.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+_REGISTRY: List["_Metric"] = []
+_registry_lock = threading.Lock()
+
+
+def _label_str(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_label_str(self.labelnames, k)} {v:g}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """Read at scrape time from a callback, e.g. the current queue depth."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, fn: Callable[[], float]):
+        super().__init__(name, help_text)
+        self.fn = fn
+
+    def _samples(self) -> List[str]:
+        try:
+            return [f"{self.name} {float(self.fn()):g}"]
+        except Exception:
+            return []
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[i] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(c), s[0])) for k, (c, s) in self._values.items())
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _label_str(self.labelnames, key, 'le="%g"' % bound)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            cumulative += counts[-1]
+            labels = _label_str(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_str(self.labelnames, key)} {total:g}")
+            lines.append(f"{self.name}_count{_label_str(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+def render() -> str:
+    with _registry_lock:
+        metrics = list(_REGISTRY)
+    lines: List[str] = []
+    for m in metrics:
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+
+# Shared metrics. Per-resume stages (extract, skills, parse) are observed once per resume; batch
+# stages (embed, llm, persist) once per job.
+STAGE_SECONDS = Histogram("cvalign_stage_seconds", "Time spent per analysis stage.", ["stage"])
+CACHE_REQUESTS = Counter("cvalign_cache_requests_total", "Cache lookups by cache and result.", ["cache", "result"])
+LLM_REQUESTS = Counter("cvalign_llm_requests_total", "LLM HTTP requests by outcome.", ["outcome"])
+LLM_LATENCY = Histogram("cvalign_llm_request_seconds", "Latency of individual LLM HTTP requests.")
+LLM_PROMPT_TOKENS = Histogram("cvalign_llm_prompt_tokens", "Estimated prompt tokens per LLM request, by part.",
+                              ["part"], buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000))
+LLM_TOKENS = Counter("cvalign_llm_tokens_total", "Tokens reported by the LLM API.", ["kind"])
+JOB_QUEUE_WAIT = Histogram("cvalign_job_queue_wait_seconds", "Time analysis jobs spend queued before a worker starts them.")
+JOB_DURATION = Histogram("cvalign_job_duration_seconds", "Run time of analysis jobs by final state.", ["state"])
+RESUMES_PROCESSED = Counter("cvalign_resumes_processed_total", "Resumes scored, by outcome.", ["outcome"])
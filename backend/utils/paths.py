@@ -0,0 +1,12 @@
+import os
+from pathlib import Path
+
+# Detect Hugging Face environment to use the correct writable directory
+RUNNING_IN_HF = "SPACE_ID" in os.environ
+
+if os.getenv("DATA_DIR"):
+    BASE_DIR = Path(os.environ["DATA_DIR"])  # Explicit override, e.g. isolated benchmark runs
+elif RUNNING_IN_HF:
+    BASE_DIR = Path("/tmp")  # Hugging Face can only write to /tmp
+else:
+    BASE_DIR = Path(__file__).resolve().parent.parent  # Local dev: backend/
@@ -0,0 +1,25 @@
+import multiprocessing
+import threading
+from typing import Iterable
+
+# The server runs worker, heartbeat and threadpool threads before any process pool starts, and a
+# plain fork copies whatever locks those threads held at that instant. The forkserver is started
+# fresh (single-threaded) and forks pool workers from itself, with the modules they need preloaded.
+DEFAULT_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+_preload = set()
+_preload_lock = threading.Lock()
+
+
+def pool_context(method: str = DEFAULT_START_METHOD, preload: Iterable[str] = ()):
+    """multiprocessing context for a ProcessPoolExecutor, adding modules to the forkserver preload.
+
+    set_forkserver_preload replaces the list, so every module's preloads are accumulated here;
+    register them at import time, before the first pool starts the forkserver.
+    """
+    ctx = multiprocessing.get_context(method)
+    if method == "forkserver":
+        with _preload_lock:
+            _preload.update(preload)
+            ctx.set_forkserver_preload(sorted(_preload))
+    return ctx
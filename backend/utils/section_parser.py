@@ -0,0 +1,200 @@
+import re
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+# Patterns are compiled once here instead of going through the re cache on every call.
+EMAIL_RE = re.compile(r"\S+@\S+")
+MULTISPACE_RE = re.compile(r"\s{2,}")
+DEGREE_RE = re.compile(r"(B\.?Tech|M\.?Tech|B\.?E|B\.?Sc|M\.?Sc|Bachelor|Master|Ph\.?D|MBA)", re.I)
+INST_RE = re.compile(r"(Indian Institute of Technology|IIT\s?-?\s?[A-Za-z]+|NIT\s?-?\s?[A-Za-z]+|National Institute of Technology|University|College|Institute of Technology)", re.I)
+CGPA_RE = re.compile(r"(?:CGPA|CPI)\s*:?\s*([0-9]\.\d{1,2})", re.I)
+YEAR_RE = re.compile(r"(\d{4}\s*-\s*\d{4}|\d{4}\s*-\s*Present)", re.I)
+STATED_YEARS_RE = re.compile(r"(\d{1,2})\s*\+?\s*(years|yrs|y)", re.I)
+STATED_EXPERIENCE_RE = re.compile(r"experience[:\-]?\s*(\d{1,2})", re.I)
+
+_MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+_DATE = r"(?:(?P<{p}mon>jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?,?\s*|(?P<{p}num>\d{{1,2}})\s*[/.\-]\s*)?(?P<{p}year>(?:19|20)\d{{2}})"
+DATE_RANGE_RE = re.compile(
+    _DATE.format(p="s") + r"\s*(?:-|–|—|to|till|until)\s*(?:(?P<present>present|current|now|till date|ongoing)|"
+    + _DATE.format(p="e") + r")",
+    re.I,
+)
+
+# Normalized heading text -> section name. Headings are matched as whole short lines.
+SECTION_HEADINGS = {
+    "education": "education", "academics": "education", "academic background": "education",
+    "academic details": "education", "academic qualifications": "education", "qualifications": "education",
+    "educational qualifications": "education", "education and training": "education",
+    "experience": "experience", "work experience": "experience", "professional experience": "experience",
+    "employment": "experience", "employment history": "experience", "work history": "experience",
+    "internships": "experience", "internship": "experience", "internship experience": "experience",
+    "experience and internships": "experience", "relevant experience": "experience",
+    "skills": "skills", "technical skills": "skills", "key skills": "skills", "core skills": "skills",
+    "skills and tools": "skills", "technologies": "skills", "tech stack": "skills",
+    "projects": "projects", "personal projects": "projects", "academic projects": "projects",
+    "key projects": "projects",
+    "certifications": "certifications", "courses": "certifications", "achievements": "achievements",
+    "awards": "achievements", "summary": "summary", "profile": "summary", "objective": "summary",
+    "career objective": "summary", "about me": "summary",
+}
+_HEADING_CLEAN_RE = re.compile(r"[^a-z ]+")
+_LETTERS_RE = re.compile(r"[a-z]{2,}", re.I)
+# Sections whose date ranges count as work history. "header" is everything before the first
+# heading, used only when the resume has no experience section.
+_WORK_SECTIONS = ("experience", "header")
+_MAX_HEADING_LEN = 40
+
+
+def clean_line(line: str) -> str:
+    line = EMAIL_RE.sub("", line)
+    line = MULTISPACE_RE.sub(" ", line).strip(" |:-\t")
+    return line.strip()
+
+
+def _heading(line: str) -> Optional[str]:
+    if len(line) > _MAX_HEADING_LEN:
+        return None
+    key = " ".join(_HEADING_CLEAN_RE.sub(" ", line.lower()).split())
+    return SECTION_HEADINGS.get(key)
+
+
+def _month_index(m: re.Match, prefix: str, default_month: int) -> int:
+    year = int(m.group(prefix + "year"))
+    month = default_month
+    if m.group(prefix + "mon"):
+        month = _MONTHS[m.group(prefix + "mon").lower()[:3]]
+    elif m.group(prefix + "num"):
+        n = int(m.group(prefix + "num"))
+        if 1 <= n <= 12:
+            month = n
+    return year * 12 + (month - 1)
+
+
+def _range_months(m: re.Match, today: date) -> Optional[Tuple[int, int]]:
+    """Half-open month span of a date range.
+
+    An end with a month is inclusive, so "Jan 2020 - Jan 2020" counts one month. A year-only end
+    counts up to the start of that year, so "2022 - 2023" is one year, not two.
+    """
+    start = _month_index(m, "s", 1)
+    if m.group("present"):
+        end = today.year * 12 + today.month
+    elif m.group("emon") or m.group("enum"):
+        end = _month_index(m, "e", 1) + 1
+    else:
+        end = _month_index(m, "e", 1)
+    if end <= start:
+        return None
+    return start, end
+
+
+def _merged_months(ranges: List[Tuple[int, int]]) -> int:
+    """Total months covered by possibly overlapping ranges."""
+    total, cur_start, cur_end = 0, None, None
+    for start, end in sorted(ranges):
+        if cur_end is None or start > cur_end:
+            if cur_end is not None:
+                total += cur_end - cur_start
+            cur_start, cur_end = start, end
+        else:
+            cur_end = max(cur_end, end)
+    if cur_end is not None:
+        total += cur_end - cur_start
+    return total
+
+
+def parse_resume(text: str, today: Optional[date] = None) -> Dict[str, Any]:
+    """Splits a resume into sections and extracts education and experience in one pass over its lines.
+
+    Returns a record with the section lines, degrees, institutions, CGPA, experience date ranges,
+    the best education line summary ("education") and total experience in whole years.
+    """
+    today = today or date.today()
+    record: Dict[str, Any] = {
+        "sections": {},
+        "degrees": [],
+        "institutions": [],
+        "cgpa": None,
+        "date_ranges": [],
+        "education": "Unknown",
+        "experience_years": 0,
+        "stated_experience_years": 0,
+    }
+    if not text:
+        return record
+
+    sections: Dict[str, List[str]] = {}
+    current = "header"
+    best_score = 0
+    ranges_by_section: Dict[str, List[Tuple[int, int]]] = {s: [] for s in _WORK_SECTIONS}
+    stated_years = None
+    prev_education = False
+
+    for raw in text.splitlines():
+        if not raw.strip():
+            continue
+        line = clean_line(raw)
+        heading = _heading(line)
+        if heading:
+            current = heading
+            prev_education = False
+            continue
+        sections.setdefault(current, []).append(line)
+
+        degree_match = DEGREE_RE.search(line)
+        inst_match = INST_RE.search(line) if degree_match or current == "education" else None
+        is_education_line = current == "education" or bool(degree_match and inst_match)
+        # A line holding only dates right after a degree line ("B.Tech, IIT Delhi" / "2016 - 2020")
+        # gives that degree's years, not a job's.
+        if prev_education and not is_education_line and not _LETTERS_RE.search(DATE_RANGE_RE.sub("", line)):
+            is_education_line = True
+        prev_education = is_education_line
+        if is_education_line:
+            if degree_match:
+                record["degrees"].append(degree_match.group(0).strip())
+            if inst_match:
+                record["institutions"].append(inst_match.group(0).strip())
+
+        if degree_match and inst_match:
+            score, parts = 4, [degree_match.group(0).strip(), inst_match.group(0).strip()]
+            year_match, cgpa_match = YEAR_RE.search(line), CGPA_RE.search(line)
+            if year_match: score, parts = score + 1, parts + [year_match.group(0).strip()]
+            if cgpa_match: score, parts = score + 1, parts + [cgpa_match.group(0).strip()]
+            if score > best_score:
+                best_score = score
+                record["education"] = " | ".join(parts)
+                record["cgpa"] = float(cgpa_match.group(1)) if cgpa_match else None
+
+        if current in ranges_by_section and not is_education_line:
+            for m in DATE_RANGE_RE.finditer(line):
+                span = _range_months(m, today)
+                if span is None:
+                    continue
+                record["date_ranges"].append(m.group(0).strip())
+                ranges_by_section[current].append(span)
+
+        if stated_years is None:
+            m = STATED_YEARS_RE.search(line)
+            if m:
+                stated_years = int(m.group(1))
+
+    if stated_years is None:
+        m = STATED_EXPERIENCE_RE.search(text)
+        stated_years = int(m.group(1)) if m else 0
+
+    if record["cgpa"] is None:
+        for line in sections.get("education", []):
+            m = CGPA_RE.search(line)
+            if m:
+                record["cgpa"] = float(m.group(1))
+                break
+
+    # Only work-history ranges count when the resume has an experience section; otherwise fall back
+    # to ranges before the first heading, then to an explicitly stated "N years". Projects,
+    # education and achievements never count.
+    ranges = ranges_by_section["experience" if "experience" in sections else "header"]
+    record["sections"] = sections
+    record["stated_experience_years"] = stated_years
+    record["experience_years"] = _merged_months(ranges) // 12 if ranges else stated_years
+    return record
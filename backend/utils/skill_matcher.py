@@ -0,0 +1,108 @@
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_TAXONOMY_PATH = Path(__file__).resolve().parent.parent / "data" / "skill_taxonomy.json"
+SKILL_TAXONOMY_PATH = Path(os.getenv("SKILL_TAXONOMY_PATH", str(DEFAULT_TAXONOMY_PATH)))
+
+# A match must not be glued to a letter or digit on either side, so "git" does not match "digital"
+# and "rest" does not match "interested". Symbols such as "+", "#" and "." may end a term ("c++", "c#").
+_LEFT_BOUNDARY = r"(?<![a-z0-9])"
+_RIGHT_BOUNDARY = r"(?![a-z0-9])"
+_WS_RE = re.compile(r"\s+")
+
+
+def _normalize(term: str) -> str:
+    return _WS_RE.sub(" ", term.strip().lower())
+
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    """Regex for a character trie. Shared prefixes are factored out, so the engine walks one
+    path per start position instead of trying every term in turn."""
+    alts = []
+    for ch in sorted(k for k in node if k):
+        atom = r"\s+" if ch == " " else re.escape(ch)
+        alts.append(atom + _trie_pattern(node[ch]))
+    if not alts:
+        return ""
+    terminal = "" in node
+    if len(alts) == 1 and not terminal:
+        return alts[0]
+    group = "(?:" + "|".join(alts) + ")"
+    # Greedy "?" prefers the longer term and backs off to the shorter one if the boundary fails.
+    return group + "?" if terminal else group
+
+
+class SkillMatcher:
+    """Finds every known term in a text in a single left-to-right regex pass.
+
+    `terms` maps each surface form (skill name or synonym) to the canonical name reported for it.
+    """
+
+    def __init__(self, terms: Dict[str, str], categories: Optional[Dict[str, str]] = None):
+        self._canonical = {_normalize(t): c for t, c in terms.items() if _normalize(t)}
+        self._categories = categories or {}
+        trie: Dict[str, dict] = {}
+        for term in self._canonical:
+            node = trie
+            for ch in term:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+        body = _trie_pattern(trie) if trie else "(?!)"
+        self._regex = re.compile(_LEFT_BOUNDARY + "(?:" + body + ")" + _RIGHT_BOUNDARY)
+
+    @classmethod
+    def from_keywords(cls, keywords: Iterable[str]) -> "SkillMatcher":
+        return cls({k: _normalize(k) for k in keywords})
+
+    @property
+    def canonical_names(self) -> List[str]:
+        return sorted(set(self._canonical.values()))
+
+    def category(self, skill: str) -> Optional[str]:
+        return self._categories.get(skill)
+
+    def find(self, text: str) -> List[str]:
+        """Sorted canonical names of every term present in text."""
+        if not text:
+            return []
+        found = set()
+        for m in self._regex.finditer(text.lower()):
+            found.add(self._canonical[_WS_RE.sub(" ", m.group(0))])
+        return sorted(found)
+
+    def contains_any(self, text: str) -> bool:
+        return bool(text) and self._regex.search(text.lower()) is not None
+
+
+def load_taxonomy(path: Path = SKILL_TAXONOMY_PATH) -> Dict[str, Dict[str, List[str]]]:
+    """Reads {"categories": {category: {skill: [synonyms, ...]}}} from a JSON file."""
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return data["categories"]
+
+
+def load_ambiguous_terms(path: Path = SKILL_TAXONOMY_PATH) -> List[str]:
+    """The taxonomy's "ambiguous" list: skill names that are also everyday words ("swift", "excel")."""
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return data.get("ambiguous", [])
+
+
+def build_skill_matcher(taxonomy: Dict[str, Dict[str, List[str]]], ambiguous: Iterable[str] = ()) -> SkillMatcher:
+    """Matcher for every skill name and synonym in the taxonomy.
+
+    Terms listed in `ambiguous` are not matched on their own, only through their qualified
+    synonyms ("microsoft excel", "swift programming"), so plain English does not produce skills.
+    """
+    skip = {_normalize(t) for t in ambiguous}
+    terms: Dict[str, str] = {}
+    categories: Dict[str, str] = {}
+    for category, skills in taxonomy.items():
+        for name, synonyms in skills.items():
+            canonical = _normalize(name)
+            categories[canonical] = category
+            for term in [name, *synonyms]:
+                if _normalize(term) not in skip:
+                    terms[term] = canonical
+    return SkillMatcher(terms, categories)
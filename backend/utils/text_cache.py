@@ -0,0 +1,127 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from .paths import BASE_DIR
+
+# Overridable so benchmarks and tests can work on a throwaway cache instead of the server's.
+TEXT_CACHE_DIR = Path(os.getenv("TEXT_CACHE_DIR") or BASE_DIR / "cache" / "text")
+# Upper bound on the total size of cached text; least recently used entries are evicted first.
+TEXT_CACHE_MAX_BYTES = int(os.getenv("TEXT_CACHE_MAX_MB", "256")) * 1024 * 1024
+
+_HASH_CHUNK = 1024 * 1024
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+# Running estimate of the cache size so a directory scan is only needed once it may be over budget.
+_approx_bytes: Optional[int] = None
+
+
+def file_digest(file_path: str) -> str:
+    """sha256 of the file's bytes, read in chunks so large uploads are not buffered."""
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_key(digest: str, version: str) -> str:
+    return hashlib.sha256(f"{version}:{digest}".encode()).hexdigest()
+
+
+def _entry_path(key: str) -> Path:
+    # Two-level fan-out keeps directory listings small on large caches.
+    return TEXT_CACHE_DIR / key[:2] / f"{key}.txt"
+
+
+def get(key: str) -> Optional[str]:
+    p = _entry_path(key)
+    try:
+        text = p.read_text(encoding="utf-8")
+    except (FileNotFoundError, OSError):
+        with _lock:
+            _stats["misses"] += 1
+        return None
+    try:
+        os.utime(p)  # mtime doubles as the LRU timestamp
+    except OSError:
+        pass
+    with _lock:
+        _stats["hits"] += 1
+    return text
+
+
+def put(key: str, text: str) -> None:
+    p = _entry_path(key)
+    try:
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, p)
+    except OSError as e:
+        print(f"[WARN] Could not write text cache entry {key}: {e}")
+        return
+    _evict_if_needed(len(text.encode("utf-8")))
+
+
+def _scan():
+    entries = []
+    for e in TEXT_CACHE_DIR.glob("*/*.txt"):
+        try:
+            st = e.stat()
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, e))
+    return entries
+
+
+def _evict_if_needed(added: int) -> None:
+    global _approx_bytes
+    with _lock:
+        if _approx_bytes is not None:
+            _approx_bytes += added
+            if _approx_bytes <= TEXT_CACHE_MAX_BYTES:
+                return
+    entries = _scan()
+    total = sum(size for _, size, _ in entries)
+    if total <= TEXT_CACHE_MAX_BYTES:
+        with _lock:
+            _approx_bytes = total
+        return
+    entries.sort(key=lambda x: x[0])
+    for _, size, path in entries:
+        if total <= TEXT_CACHE_MAX_BYTES:
+            break
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+        with _lock:
+            _stats["evictions"] += 1
+    with _lock:
+        _approx_bytes = total
+
+
+def stats() -> Dict[str, float]:
+    with _lock:
+        s = dict(_stats)
+    lookups = s["hits"] + s["misses"]
+    s["hit_rate"] = round(s["hits"] / lookups, 4) if lookups else 0.0
+    return s
+
+
+def clear() -> None:
+    global _approx_bytes
+    for p in TEXT_CACHE_DIR.glob("*/*.txt"):
+        try:
+            p.unlink()
+        except OSError:
+            pass
+    with _lock:
+        for k in _stats:
+            _stats[k] = 0
+        _approx_bytes = None
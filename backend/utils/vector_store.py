@@ -0,0 +1,212 @@
+import heapq
+import json
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .paths import BASE_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, a single server process is assumed.
+    fcntl = None
+
+INDEX_DIR = BASE_DIR / "index"
+
+# Rows scored per step during search, so a 50k-resume store never materializes a full score array at once.
+SEARCH_CHUNK_ROWS = 8192
+
+
+class ResumeVectorStore:
+    """Append-only store of resume embeddings.
+
+    Vectors live in a raw float32 file that is read through np.memmap; rows are never rewritten.
+    A JSON-lines log alongside it records which row belongs to which resume and which resumes
+    were deleted, so adds and deletes are both appends and the store never needs rebuilding.
+
+    Several processes can share one store: writes hold an exclusive flock on a lock file, a new
+    row's number comes from the vector file's size under that lock, and every read first applies
+    the log lines other processes appended since the last read.
+    """
+
+    def __init__(self, directory: Path = INDEX_DIR):
+        self.directory = Path(directory)
+        self.vectors_path = self.directory / "vectors.f32"
+        self.log_path = self.directory / "entries.jsonl"
+        self.lock_path = self.directory / "store.lock"
+        self.dim: Optional[int] = None
+        self._rows: Dict[int, Dict[str, Any]] = {}  # row number -> entry
+        self._live: Dict[str, int] = {}  # resume_id -> row number
+        self._log_offset = 0  # bytes of the log applied so far
+        self._mmap: Optional[np.memmap] = None
+        self._lock = threading.RLock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock, self._file_lock():
+            self._catch_up()
+            self._drop_orphan_vectors()
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared with other processes using the same directory."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _catch_up(self) -> None:
+        """Applies log lines written since the last call, by this or another process."""
+        try:
+            if self.log_path.stat().st_size <= self._log_offset:
+                return
+        except FileNotFoundError:
+            return
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_offset)
+            data = f.read()
+        # A line without its newline is still being written (or was torn by a crash); it is
+        # picked up on a later call once complete.
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # torn line from an interrupted write
+            op = rec.get("op")
+            if op == "init":
+                self.dim = rec["dim"]
+            elif op == "add":
+                self._rows[rec["row"]] = rec
+                self._live[rec["id"]] = rec["row"]
+            elif op == "delete":
+                self._live.pop(rec["id"], None)
+        self._log_offset += end
+
+    def _drop_orphan_vectors(self) -> None:
+        # Vector bytes written by a process that died before appending their log line. Called
+        # under the file lock, so no other process is between those two writes.
+        if not self.dim or not self.vectors_path.exists():
+            return
+        expected = (max(self._rows) + 1 if self._rows else 0) * 4 * self.dim
+        if self.vectors_path.stat().st_size > expected:
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(expected)
+
+    def _append_log(self, rec: Dict[str, Any]) -> None:
+        line = (json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8")
+        with open(self.log_path, "a+b") as f:
+            # Called under the file lock, so a missing final newline is a line torn by a crash;
+            # end it so this record isn't glued onto it.
+            if f.tell():
+                f.seek(-1, 2)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+            f.write(line)
+
+    def _matrix(self) -> np.ndarray:
+        n = max(self._rows) + 1 if self._rows else 0
+        if self._mmap is None or self._mmap.shape[0] != n:
+            if n == 0:
+                return np.zeros((0, self.dim or 0), dtype=np.float32)
+            self._mmap = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(n, self.dim))
+        return self._mmap
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._catch_up()
+            return len(self._live)
+
+    def __contains__(self, resume_id: str) -> bool:
+        with self._lock:
+            self._catch_up()
+            return resume_id in self._live
+
+    def add(self, resume_id: str, vector, path: str = "", name: str = "") -> bool:
+        """Appends a resume's embedding. Returns False if the resume is already stored."""
+        vec = np.asarray(vector, dtype=np.float32).ravel()
+        with self._lock, self._file_lock():
+            self._catch_up()
+            if resume_id in self._live:
+                return False
+            if self.dim is None:
+                self.dim = int(vec.shape[0])
+                self._append_log({"op": "init", "dim": self.dim})
+            if vec.shape[0] != self.dim:
+                raise ValueError(f"Embedding has dimension {vec.shape[0]}, store expects {self.dim}")
+            row_bytes = 4 * self.dim
+            with open(self.vectors_path, "ab") as f:
+                size = f.tell()
+                if size % row_bytes:  # partial vector from a writer that died mid-write
+                    f.truncate(size - size % row_bytes)
+                row = size // row_bytes
+                f.write(vec.tobytes())
+            rec = {"op": "add", "row": row, "id": resume_id, "path": path, "name": name}
+            self._append_log(rec)
+            self._catch_up()  # applies our own lines and moves the offset past them
+            return True
+
+    def delete(self, resume_id: str) -> bool:
+        with self._lock, self._file_lock():
+            self._catch_up()
+            if resume_id not in self._live:
+                return False
+            self._append_log({"op": "delete", "id": resume_id})
+            self._catch_up()
+            return True
+
+    def search(self, query, k: int = 10) -> List[Dict[str, Any]]:
+        """Top-k live resumes by cosine similarity, selected with a size-k heap."""
+        q = np.asarray(query, dtype=np.float32).ravel()
+        q_norm = float(np.linalg.norm(q))
+        with self._lock:
+            self._catch_up()
+            if k <= 0 or not self._live or q_norm == 0:
+                return []
+            matrix = self._matrix()
+            live = np.zeros(matrix.shape[0], dtype=bool)
+            live[list(self._live.values())] = True
+            rows = dict(self._rows)
+        heap: List[tuple] = []
+        for start in range(0, matrix.shape[0], SEARCH_CHUNK_ROWS):
+            block = np.asarray(matrix[start:start + SEARCH_CHUNK_ROWS])
+            norms = np.linalg.norm(block, axis=1) * q_norm
+            dots = block @ q
+            scores = np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+            scores[~live[start:start + block.shape[0]]] = -np.inf
+            # Only rows that can still enter the heap are visited in Python.
+            threshold = heap[0][0] if len(heap) >= k else -np.inf
+            for offset in np.nonzero(scores > threshold)[0].tolist():
+                item = (float(scores[offset]), start + offset)
+                if len(heap) < k:
+                    heapq.heappush(heap, item)
+                elif item[0] > heap[0][0]:
+                    heapq.heapreplace(heap, item)
+        hits = []
+        for score, row in sorted(heap, reverse=True):
+            rec = rows[row]
+            hits.append({
+                "resume_id": rec["id"],
+                "name": rec.get("name", ""),
+                "path": rec.get("path", ""),
+                "score": round(score * 100, 2),
+            })
+        return hits
+
+
+_store: Optional[ResumeVectorStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> ResumeVectorStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResumeVectorStore()
+        return _store
@@ -17,6 +17,7 @@ interface Props {
 const JDUploader: React.FC<Props> = ({ weights, onCandidates }) => {
   const [resumeFiles, setResumeFiles] = useState<FileList | null>(null);
   const [jdFile, setJdFile] = useState<File | null>(null);
+  const [batchId, setBatchId] = useState<string | null>(null);
   const [loading, setLoading] = useState(false);
   const toast = useToast();
 
@@ -46,9 +47,10 @@ const JDUploader: React.FC<Props> = ({ weights, onCandidates }) => {
     Array.from(resumeFiles).forEach(f => form.append("files", f));
 
     try {
-      await axios.post(`${API_BASE}/resume/upload-resumes/`, form, {
+      const res = await axios.post(`${API_BASE}/resume/upload-resumes/`, form, {
         headers: { "Content-Type": "multipart/form-data" },
       });
+      setBatchId(res.data?.batch_id ?? null);
       toast({ title: "Resumes uploaded successfully!", status: "success", isClosable: true });
     } catch (error) {
       showUploadError("Resume Upload Failed", error);
@@ -76,6 +78,7 @@ const JDUploader: React.FC<Props> = ({ weights, onCandidates }) => {
     }
     const form = new FormData();
     form.append("jd_file", jdFile);
+    if (batchId) form.append("batch_id", batchId);
     form.append("education_weight", String(weights.education));
     form.append("experience_weight", String(weights.experience));
     form.append("skills_weight", String(weights.skills));